@@ -0,0 +1,9 @@
+import sys
+import os
+
+# Modules of the viewer import each other by their top level names
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main  # noqa: E402
+
+sys.exit(main())
@@ -1,19 +1,128 @@
 from tkinter import *
 import tkinter.ttk as ttk
 import components
-from widgets import Grid, ContextMenu
-from threading import Thread
+import codespace
+from widgets import Grid, GridCell, GridCanvas, ContextMenu, NamedFont
+from coverage import CoverageCache
+from tracing import tracer, span
+from events import EventBus, Event
+import favourites
+from contextlib import contextmanager
+from importlib import import_module
 from copy import copy
-import dialogs
-import shelve
+import time
 
 MAX_GRID_WIDTH, MAX_GRID_HEIGHT = 20, 10
 
 
+class RenderScheduler:
+    """
+    Coalesces render requests so that only the latest one is painted. Requests are
+    queued onto the Tk main loop which is the only thread allowed to touch widgets.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.latest = None
+        self.code_points = None
+        self._job = None
+        self.requested = 0
+        self.rendered = 0
+        self.coalesced = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._job is not None
+
+    def request(self, from_: int, code_points: list = None) -> None:
+        self.requested += 1
+        self.latest = from_
+        self.code_points = code_points
+        if self.busy:
+            # A render is already queued and will pick up the latest request
+            self.coalesced += 1
+            return
+        self._job = self.app.after_idle(self._flush)
+
+    def cancel(self) -> None:
+        if self.busy:
+            self.app.after_cancel(self._job)
+            self._job = None
+
+    def _flush(self) -> None:
+        self._job = None
+        self.rendered += 1
+        self.app._render(self.latest, self.code_points)
+        if tracer.enabled:
+            # Tk redraws during idle time anyway, doing it here lets it be told apart from rendering
+            with span("tk redraw"):
+                self.app.update_idletasks()
+        self.code_points = None
+        # Out of range requests are ignored by the app so stay in sync with what is displayed
+        self.latest = self.app._from
+
+    def __repr__(self):
+        return "RenderScheduler(requested={}, rendered={}, coalesced={})".format(
+            self.requested, self.rendered, self.coalesced
+        )
+
+
+class HoverThrottle:
+    """
+    Coalesces hover broadcasts to at most one per frame. Only the latest grid is broadcast and
+    nothing is broadcast if that grid, showing the same code point, was the last one broadcast.
+    """
+    FRAME_MS = 16
+
+    def __init__(self, app, frame_ms: int = FRAME_MS):
+        self.app = app
+        self.frame_ms = frame_ms
+        self.pending = None
+        self._job = None
+        self._flushed = 0
+        # Grid and code point last broadcast
+        self._last = None
+        self.requested = 0
+        self.broadcast = 0
+
+    def request(self, grid) -> None:
+        self.requested += 1
+        self.pending = grid
+        if self._job is not None:
+            return
+        wait = self.frame_ms - (time.perf_counter() - self._flushed) * 1000
+        if wait <= 0:
+            self.flush()
+        else:
+            self._job = self.app.after(int(wait) + 1, self.flush)
+
+    def flush(self) -> None:
+        self._job = None
+        self._flushed = time.perf_counter()
+        grid = self.pending
+        last = (grid, grid.value if grid is not None else None)
+        if last == self._last:
+            return
+        self._last = last
+        self.broadcast += 1
+        self.app.broadcast_grid(grid)
+
+    def __repr__(self):
+        return "HoverThrottle(requested={}, broadcast={})".format(self.requested, self.broadcast)
+
+
 # noinspection PyArgumentList
 class App(Tk):
 
-    def __init__(self, ):
+    def __init__(self, backend: str = "labels", max_size: (int, int) = (MAX_GRID_WIDTH, MAX_GRID_HEIGHT)):
+        """
+        :param backend: "labels" renders a label widget per grid while "canvas" draws all grids on
+            a single canvas which allows much larger maximum sizes
+        :param max_size: maximum number of grids as (width, height)
+        """
+        # Milliseconds spent in each phase of startup
+        self.startup_timings = {}
+        started = time.perf_counter()
         super().__init__()
         self.geometry('800x500')
         self.config(bg='#5a5a5a')
@@ -37,31 +146,80 @@ class App(Tk):
                                        ("\ue923", "Copy code point", lambda: self.active_grid.copy(2)),
                                        ("\ue923", "Copy hexadecimal scalar", lambda: self.active_grid.copy(1)),
                                        ('separator',),
-                                       ("\ue7a9", "Save as image", lambda: dialogs.SaveAsImage(self)),
+                                       ("\ue7a9", "Save as image", lambda: self.open_dialog("SaveAsImage")),
                                        ("\ue735", "Add to favorites", lambda: self.toggle_from_favourites()),
-                                       ("\ue946", "Unicode info", lambda: dialogs.UnicodeInfo(self))
+                                       ("\ue946", "Unicode info", lambda: self.open_dialog("UnicodeInfo")),
+                                       ("\ue7a9", "Export sheet", lambda: self.open_dialog("ExportSheet"))
                                        )
-        self._size = (MAX_GRID_WIDTH, MAX_GRID_HEIGHT)
+        self.backend = backend
+        self.max_size = self._size = tuple(max_size)
+        self.favourites = favourites.get_store()
+        # Glyph coverage of the selected font, None when it cannot be determined
+        self.coverage_cache = CoverageCache()
+        self.coverage = None
+        # Rasterized glyphs shown by dialogs, created with the first dialog since it needs Pillow
+        self._glyph_cache = None
+        # Named font shared by all grids. Changing its family re-lays out every grid at once
+        self.grid_font = NamedFont(self, family="Arial", size=12)
         self.grids = []
         self.grid_cluster = []
-        self.init_grids()
+        with self.measure("grids"):
+            self.init_grids()
         self.active_grid = None
+        # Components subscribe to the events they handle when they are created
+        self.bus = EventBus(self)
         # Plugin components here. Your component has to inherit the Component class
-        # Components not placed here will not be rendered or receive broadcast events
-        self.components = [
-            components.Swipe(self),
-            components.RenderRangeControl(self),
-            components.GridTracker(self),
-            components.RenderSizeControl(self),
-            components.FontSelector(self),
-            components.FavouritesManager(self)
-        ]
-        self._from = 0
-        self.render_thread = None
+        with self.measure("components"):
+            self.components = [
+                components.Swipe(self),
+                components.RenderRangeControl(self),
+                components.SearchControl(self),
+                components.GridTracker(self),
+                components.RenderSizeControl(self),
+                components.FontSelector(self),
+                components.FavouritesManager(self),
+                components.Scroller(self)
+            ]
+        self._from = self._to = 0
+        # Search results being paged through and the position of the displayed page within them
+        self.results = None
+        self.results_offset = 0
+        self.renderer = RenderScheduler(self)
+        self.hover = HoverThrottle(self)
         self.render(59422)
         self.size = (10, 5)
         self.style = ttk.Style()
         self.style.configure('Horizontal.TScale', background='#5a5a5a')
+        self.startup_timings["total"] = (time.perf_counter() - started) * 1000
+        self._started = started
+        self.bind('<Map>', self._mapped, add=True)
+
+    def _mapped(self, event):
+        # Every widget of the window shares the binding so only the window itself is considered
+        if event.widget is self and "mapped" not in self.startup_timings:
+            self.startup_timings["mapped"] = (time.perf_counter() - self._started) * 1000
+
+    @property
+    def glyph_cache(self):
+        if self._glyph_cache is None:
+            from glyphs import GlyphCache
+            self._glyph_cache = GlyphCache(self, self.coverage_cache.font_path)
+        return self._glyph_cache
+
+    def open_dialog(self, name: str):
+        """
+        Open one of the dialogs of the dialogs module which is only imported when first needed
+        :param name: class name of the dialog
+        """
+        return getattr(import_module("dialogs"), name)(self)
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = (time.perf_counter() - start) * 1000
 
     @property
     def size(self) -> (int, int):
@@ -69,23 +227,25 @@ class App(Tk):
 
     @size.setter
     def size(self, value: (int, int)):
-        if value[0] > MAX_GRID_WIDTH:
-            raise ValueError("Width set exceeds maximum: {}".format(MAX_GRID_WIDTH))
-        elif value[1] > MAX_GRID_HEIGHT:
-            raise ValueError("Height set exceeds maximum: {}".format(MAX_GRID_HEIGHT))
+        if value[0] > self.max_size[0]:
+            raise ValueError("Width set exceeds maximum: {}".format(self.max_size[0]))
+        elif value[1] > self.max_size[1]:
+            raise ValueError("Height set exceeds maximum: {}".format(self.max_size[1]))
         if self.size == value:
             # This condition prevents dangerous recursions that may be
             return
         self._size = value
-        w_lower_bound = (MAX_GRID_WIDTH - value[0]) // 2
-        h_lower_bound = (MAX_GRID_HEIGHT - value[1]) // 2
+        w_lower_bound = (self.max_size[0] - value[0]) // 2
+        h_lower_bound = (self.max_size[1] - value[1]) // 2
         self.grid_cluster = []
         for column in self.grids[w_lower_bound: w_lower_bound + value[0]]:
             for grid in column[h_lower_bound: h_lower_bound + value[1]]:
                 self.grid_cluster.append(grid)
-        self.render(self._from)
-        for component in self.components:
-            component.size_changed()
+        if self.results is not None:
+            self.render_results(self.results, self.results_offset)
+        else:
+            self.render(self.renderer.latest if self.renderer.latest is not None else self._from)
+        self.bus.publish(Event.SIZE)
 
     def clear_grids(self):
         for column in self.grids:
@@ -93,92 +253,132 @@ class App(Tk):
                 grid.set(None)
 
     def init_grids(self):
-        w_ratio = 1/MAX_GRID_WIDTH
-        h_ratio = 1/MAX_GRID_HEIGHT
-        for i in range(MAX_GRID_WIDTH):
+        if self.backend == "canvas":
+            self.grid_canvas = GridCanvas(self, *self.max_size, font=self.grid_font)
+            self.grid_canvas.place(x=0, y=0, relwidth=1, relheight=1)
+            self.grids = self.grid_canvas.cells
+            self.grid_cluster = [grid for column in self.grids for grid in column]
+            return
+        w_ratio = 1/self.max_size[0]
+        h_ratio = 1/self.max_size[1]
+        for i in range(self.max_size[0]):
             column = []
-            for j in range(MAX_GRID_HEIGHT):
-                grid = Grid(self)
+            for j in range(self.max_size[1]):
+                grid = Grid(self, font=self.grid_font)
                 column.append(grid)
                 self.grid_cluster.append(grid)
                 grid.place(relx=i*w_ratio, rely=j*h_ratio, relwidth=w_ratio, relheight=h_ratio)
             self.grids.append(column)
 
+    @property
+    def grid_family(self) -> str:
+        # Read without asking Tk since grids report their font on every hover
+        return self.grid_font.family
+
     @property
     def current_range(self) -> [int, int]:
-        return [self._from, self._from + self.size[0] * self.size[1]]
+        # Skipped ranges may fall within a page so the end is tracked rather than computed
+        return [self._from, self._to]
 
-    def _render(self, from_: int, prev_thread: Thread = None) -> None:
-        if from_ > 0xffff:
-            return
-        if prev_thread:
-            prev_thread.join()
-        self._from = from_
-        self.propagate_change()
-        self.clear_grids()
-        cluster = copy(self.grid_cluster)
-        if self.active_grid:
-            self.active_grid.unlock()
-        to = from_ + self.size[0] * self.size[1]
-        # Check whether value is above
-        to = to if to <= 0xffff else 0xffff
-        for i in range(from_, to):
-            cluster[i - from_].set(i)
-        if to == 0xffff:
-            fracture_point = 0xffff - from_
-            for j in range(fracture_point, self.size[0] * self.size[1]):
-                cluster[j].set(None)
+    def _render(self, from_: int, code_points: list = None) -> None:
+        """
+        Render the page starting at from_
+        :param from_: first code point of the page
+        :param code_points: code points of the page if already laid out
+        :return:
+        """
+        with span("render"):
+            if from_ > codespace.MAX_CODE_POINT:
+                return
+            if code_points is None:
+                code_points = codespace.page(from_, self.size[0] * self.size[1])
+            if not code_points:
+                return
+            self._from, self._to = code_points[0], code_points[-1] + 1
+            self.propagate_change()
+            if self.active_grid:
+                self.active_grid.unlock()
+            # Grids only repaint when their content differs so there is no need to clear the page first
+            cluster = copy(self.grid_cluster)
+            coverage = self.coverage
+            for grid, code_point in zip(cluster, code_points):
+                grid.set(code_point, coverage is None or code_point in coverage)
+            for grid in cluster[len(code_points):]:
+                grid.set(None)
+            self.clear_hidden_grids()
+
+    def set_coverage(self, coverage) -> None:
+        # Update dimming of the displayed grids without rendering the page again
+        self.coverage = coverage
+        for grid in self.grid_cluster:
+            if grid.value is not None:
+                grid.set(grid.value, coverage is None or grid.value in coverage)
+
+    def clear_hidden_grids(self):
+        # Clear grids left over from a larger render size. Empty grids are skipped entirely
+        visible = set(self.grid_cluster)
+        for column in self.grids:
+            for grid in column:
+                if grid.value is not None and grid not in visible:
+                    grid.set(None)
+
+    @property
+    def repaint_stats(self):
+        return GridCell.stats
 
     def propagate_change(self):
-        for component in self.components:
-            component.receive_range()
+        self.bus.publish(Event.RANGE)
 
     def activate_grid(self, grid: Grid):
-        for component in self.components:
-            component.receive_grid(grid)
+        self.hover.request(grid)
 
     def deactivate_grid(self):
-        for component in self.components:
-            component.receive_grid(self.active_grid)
-
-    def render(self, from_: int) -> None:
-        self.render_thread = Thread(target=self._render, args=(from_, self.render_thread))
-        self.render_thread.start()
-
-    @staticmethod
-    def get_favourites():
-        # Ensure that favourites key exists in data
-        descriptor = shelve.open("data")
-        if not descriptor.get("favourites"):
-            descriptor['favourites'] = []
-            descriptor.sync()
-        return descriptor
+        self.hover.request(self.active_grid)
+
+    def broadcast_grid(self, grid):
+        self.bus.publish(Event.GRID, grid)
+
+    def render(self, from_: int, code_points: list = None, results=None) -> None:
+        """
+        :param results: search cursor code_points were taken from. Paging stays within it
+            until a render without results
+        """
+        self.use_results(results)
+        self.renderer.request(from_, code_points)
+
+    def use_results(self, results) -> None:
+        if self.results is not None and self.results is not results:
+            self.results.cancel()
+        self.results = results
+
+    def render_results(self, results, offset: int = 0) -> bool:
+        """
+        Render the page of search results starting at offset
+        :param results: names.SearchCursor
+        :return: False if there are no results at offset
+        """
+        code_points = results.slice(offset, self.size[0] * self.size[1])
+        if not code_points:
+            return False
+        self.results_offset = offset
+        self.render(code_points[0], code_points, results)
+        return True
 
     def favourites_as_list(self):
-        with self.get_favourites() as data:
-            return list(data["favourites"])
+        return self.favourites.as_list()
 
     def set_favourites(self, value: list) -> None:
-        with self.get_favourites() as data:
-            data["favourites"] = value
+        self.favourites.replace(value)
 
     def remove_favourites(self):
-        # Completely rip away the favourites key
-        with App.get_favourites() as data:
-            del data["favourites"]
+        self.favourites.clear()
 
     def toggle_from_favourites(self) -> None:
         grid = self.active_grid
-        with grid.app.get_favourites() as data:
-            if (grid.code_point, grid.font) in data["favourites"]:
-                fav = data["favourites"]
-                fav.remove((grid.code_point, grid.font))
-                data["favourites"] = fav
-            else:
-                data["favourites"] += [(int(grid.text, 16), grid.font)]
+        self.favourites.toggle(grid.code_point, grid.font)
 
     def request_context_menu(self, event):
-        if (self.active_grid.code_point, self.active_grid.font) in self.favourites_as_list():
+        if (self.active_grid.code_point, self.active_grid.font) in self.favourites:
             self.context_menu.entryconfigure(5, label="\ue735   Remove from favourites")
         else:
             self.context_menu.entryconfigure(5, label="\ue735   Add to favourites")
@@ -0,0 +1,30 @@
+"""
+Context menu favourites lookup latency for growing favourites lists.
+Run with: python -m benchmarks.favourites
+"""
+import tempfile
+import timeit
+import os
+from favourites import FavouritesStore
+
+SIZES = (10, 1000, 10000)
+REPEAT = 1000
+
+
+def run():
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            store = FavouritesStore(os.path.join(directory, "favourites-{}.db".format(size)))
+            store.replace([(code_point, "Arial") for code_point in range(size)])
+            store.flush()
+            # Worst case lookup of a missing favourite as done by App.request_context_menu
+            elapsed = timeit.timeit(lambda: (size + 1, "Arial") in store, number=REPEAT)
+            results[size] = elapsed / REPEAT * 1e6
+            store.close()
+    return results
+
+
+if __name__ == '__main__':
+    for size, micro_seconds in run().items():
+        print("{:>6} favourites: {:.3f} us per menu lookup".format(size, micro_seconds))
@@ -0,0 +1,49 @@
+"""
+Per hover cost of reading a grid's code point. Grids used to keep only the hex text so every hover,
+lock, copy and favourites lookup parsed it back or asked Tk for the displayed character. This compares
+that with the integer code point and cached views grids keep now. Needs a display like the tests.
+Run with: python -m benchmarks.grid
+"""
+import timeit
+from tests.support import MockApp
+import components
+
+REPEAT = 20000
+
+
+def run():
+    app = MockApp()
+    tracker = components.GridTracker(app)
+    app.components.append(tracker)
+    grid = app.grid_cluster[0]
+    grid.set(0x1f600)
+    hexadecimal = hex(grid.value)
+
+    def legacy():
+        # What a hover used to do: Tk round trip for the character plus parsing and reformatting the text
+        code_point = ord(grid['text'])
+        "{} : {}".format(chr(int(hexadecimal, 16)), hexadecimal.replace("0x", ""))
+        return code_point
+
+    def current():
+        code_point = grid.code_point
+        "{} : {}".format(grid.character, grid.hexadecimal)
+        return code_point
+
+    def hover():
+        grid.hover(True)
+        # Force a broadcast on every hover by clearing the last one
+        app.hover.request(None)
+
+    results = {
+        "legacy lookup": timeit.timeit(legacy, number=REPEAT) / REPEAT * 1e6,
+        "cached lookup": timeit.timeit(current, number=REPEAT) / REPEAT * 1e6,
+        "hover round trip": timeit.timeit(hover, number=REPEAT // 10) / (REPEAT // 10) * 1e6,
+    }
+    app.destroy()
+    return results
+
+
+if __name__ == '__main__':
+    for name, micro_seconds in run().items():
+        print("{:<18}{:.3f} us per hover".format(name, micro_seconds))
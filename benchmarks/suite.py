@@ -0,0 +1,154 @@
+"""
+Interaction benchmarks driven through MockApp, so they need a display like the tests do (xvfb-run on CI).
+Results are printed as JSON and compared against a stored baseline, a benchmark slower than its
+baseline by more than the tolerance is reported as a regression and fails the run.
+Run with: python -m benchmarks.suite [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+from statistics import median
+import argparse
+import tempfile
+import random
+import json
+import time
+import sys
+import os
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 0.25
+FAVOURITES_SIZES = (10, 1000, 100000)
+GRID_SIZES = ((6, 6), (10, 5), (15, 8), (20, 10))
+FAMILIES = ("Arial", "Courier", "Times", "Helvetica")
+
+
+def timed(function, repeat: int) -> dict:
+    """
+    Call function repeat times
+    :return: median and minimum duration of a call in milliseconds
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": median(samples), "min_ms": min(samples), "repeat": repeat}
+
+
+def bench_startup(results: dict):
+    from tests.support import MockApp
+
+    def start():
+        MockApp().destroy()
+
+    results["startup"] = timed(start, 5)
+
+
+def bench_render(results: dict, app):
+    pages = [random.randrange(0, 0x30000) for _ in range(50)]
+    for size in GRID_SIZES:
+        app.size = size
+        iterator = iter(pages)
+        results["render {}x{}".format(*size)] = timed(lambda: app._render(next(iterator)), len(pages))
+
+
+def bench_size_change(results: dict, app):
+    sizes = iter(GRID_SIZES * 10)
+    results["size change"] = timed(lambda: setattr(app, "size", next(sizes)), len(GRID_SIZES) * 10)
+
+
+def bench_font_switch(results: dict, app):
+    import components
+    selector = components.FontSelector(app)
+    families = iter(FAMILIES * 5)
+
+    def switch():
+        selector.input.set(next(families))
+        selector.apply_font()
+        # Let Tk re-layout the grids like it would before the next frame
+        app.update_idletasks()
+
+    results["font switch"] = timed(switch, len(FAMILIES) * 5)
+    selector.uninstall()
+
+
+def bench_favourites(results: dict, app, directory: str):
+    import dialogs
+    from favourites import FavouritesStore
+    previous = app.favourites
+    for size in FAVOURITES_SIZES:
+        store = FavouritesStore(os.path.join(directory, "favourites-{}.db".format(size)))
+        store.replace([(code_point, "Arial") for code_point in range(size)])
+        app.favourites = store
+        results["favourites membership {}".format(size)] = timed(lambda: (size + 1, "Arial") in store, 1000)
+        results["favourites toggle {}".format(size)] = timed(lambda: store.toggle(size + 1, "Arial"), 1000)
+
+        def open_dialog():
+            dialog = dialogs.ManageFavourites(app)
+            dialog.update_idletasks()
+            dialog.destroy()
+
+        results["manage favourites open {}".format(size)] = timed(open_dialog, 5)
+        store.close()
+    app.favourites = previous
+
+
+def run() -> dict:
+    from tests.support import MockApp
+    random.seed(0)
+    results = {}
+    bench_startup(results)
+    app = MockApp()
+    try:
+        bench_render(results, app)
+        bench_size_change(results, app)
+        bench_font_switch(results, app)
+        with tempfile.TemporaryDirectory() as directory:
+            bench_favourites(results, app, directory)
+    finally:
+        app.destroy()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """
+    :return: (name, baseline median, current median) of every benchmark slower than its baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["median_ms"]
+        if result["median_ms"] > expected * (1 + tolerance):
+            regressions.append((name, expected, result["median_ms"]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Unicode viewer benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="fraction a median may exceed its baseline by before it is a regression")
+    parser.add_argument("--output", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run()
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline at {}, nothing compared".format(args.baseline), file=sys.stderr)
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for name, expected, actual in regressions:
+        print("REGRESSION {}: {:.3f} ms -> {:.3f} ms".format(name, expected, actual), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
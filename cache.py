@@ -0,0 +1,17 @@
+"""
+Location of on-disk caches. Everything stored here can be rebuilt so it is safe to delete.
+"""
+import os
+
+
+def cache_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "unicode_viewer")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(cache_dir(), name)
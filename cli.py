@@ -0,0 +1,165 @@
+"""
+Headless command line interface. Queries share the paging, metadata and favourites modules used by
+the viewer and results are streamed as JSON lines so arbitrarily large ranges run in constant memory.
+Nothing imported here may import tkinter.
+"""
+import argparse
+import string
+import json
+import sys
+import codespace
+import metadata
+import names
+
+
+def parse_code_point(text: str) -> int:
+    """
+    Parse a code point written as U+XXXX, 0xXXXX, a plain hexadecimal scalar or a single character.
+    Single hexadecimal digits are read as scalars so the character itself is only used for the others.
+    """
+    text = text.strip()
+    if len(text) == 1 and text not in string.hexdigits:
+        return ord(text)
+    lowered = text.lower()
+    for prefix in ("u+", "0x"):
+        if lowered.startswith(prefix):
+            lowered = lowered[len(prefix):]
+    try:
+        code_point = int(lowered, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid code point: {!r}".format(text))
+    if not 0 <= code_point <= codespace.MAX_CODE_POINT:
+        raise argparse.ArgumentTypeError("code point out of range: {!r}".format(text))
+    return code_point
+
+
+def write_lines(records, out=None) -> int:
+    # Records are written as soon as they are produced, never collected
+    out = out or sys.stdout
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    out.flush()
+    return count
+
+
+def describe(code_point: int, font: str = None) -> dict:
+    data = metadata.record(code_point, font)
+    data["Character"] = chr(code_point) if not codespace.is_skipped(code_point) else None
+    return data
+
+
+def info(code_points, font=None):
+    for code_point in code_points:
+        yield describe(code_point, font)
+
+
+def range_(start: int, end: int = codespace.MAX_CODE_POINT, count: int = None, font=None):
+    for index, code_point in enumerate(codespace.iterate(start, end)):
+        if count is not None and index >= count:
+            return
+        yield describe(code_point, font)
+
+
+def search(query: str, limit: int = None):
+    for index, code_point in enumerate(names.search(query)):
+        if limit is not None and index >= limit:
+            return
+        yield describe(code_point)
+
+
+def favourites(font: str = None):
+    # Read directly from the database, listing favourites must not create or migrate it
+    import favourites as store
+    for code_point, family in store.load_favourites():
+        if font is None or family == font:
+            yield describe(code_point, family)
+
+
+def export(start: int, end: int, font: str, output: str, size: int, columns: int, covered_only: bool):
+    # Pillow is only loaded when a sheet is actually exported
+    import export as exporter
+    from coverage import CoverageCache
+    path = font if font.lower().endswith((".ttf", ".otf", ".ttc", ".otc")) else CoverageCache().font_path(font)
+    if path is None:
+        raise SystemExit("no font file found for family {!r}".format(font))
+    index = exporter.export_atlas(start, end, path, output, size=size, columns=columns, covered_only=covered_only)
+    yield {"image": output, "font": path, "glyphs": len(index["glyphs"])}
+
+
+def build():
+    # Generates the caches that are otherwise built on first use
+    for name, load in (("metadata", metadata.get_database), ("names", names.get_index)):
+        load()
+        yield {"built": name}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="unicodeviewer", description="Unicode viewer")
+    commands = parser.add_subparsers(dest="command")
+
+    command = commands.add_parser("info", help="metadata of code points")
+    command.add_argument("code_points", type=parse_code_point, nargs="+", metavar="CODE_POINT")
+    command.add_argument("--font", help="font family to report")
+
+    command = commands.add_parser("range", help="metadata of every displayable code point in a range")
+    command.add_argument("start", type=parse_code_point)
+    command.add_argument("end", type=parse_code_point, nargs="?", default=codespace.MAX_CODE_POINT)
+    command.add_argument("--count", type=int, help="stop after this many code points")
+    command.add_argument("--font", help="font family to report")
+
+    command = commands.add_parser("search", help="code points whose name matches every word of a query")
+    command.add_argument("query")
+    command.add_argument("--limit", type=int)
+
+    command = commands.add_parser("favourites", help="list saved favourites")
+    command.add_argument("--font", help="only favourites of this font family")
+
+    command = commands.add_parser("export", help="export a glyph sheet and its JSON index")
+    command.add_argument("start", type=parse_code_point)
+    command.add_argument("end", type=parse_code_point)
+    command.add_argument("--font", required=True, help="font family or font file")
+    command.add_argument("--output", "-o", required=True, help="destination PNG")
+    command.add_argument("--size", type=int, default=32, help="glyph size in pixels")
+    command.add_argument("--columns", type=int, default=32)
+    command.add_argument("--all", dest="covered_only", action="store_false",
+                         help="include code points the font has no glyph for")
+
+    commands.add_parser("build", help="generate the metadata database and name index ahead of time")
+    return parser
+
+
+def run(args, out=None) -> int:
+    if args.command == "info":
+        records = info(args.code_points, args.font)
+    elif args.command == "range":
+        records = range_(args.start, args.end, args.count, args.font)
+    elif args.command == "search":
+        records = search(args.query, args.limit)
+    elif args.command == "favourites":
+        records = favourites(args.font)
+    elif args.command == "build":
+        records = build()
+    else:
+        records = export(args.start, args.end, args.font, args.output, args.size, args.columns, args.covered_only)
+    try:
+        write_lines(records, out)
+    except BrokenPipeError:
+        # Output piped into head and the like
+        sys.stderr.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Paging over the whole unicode code space (U+0000 - U+10FFFF).
+Surrogates and the large ranges that are unassigned as of the supported unicode versions are skipped
+so that paging through the supplementary planes costs the same as paging through the Basic
+Multilingual Plane. Apart from the surrogates these ranges are only unassigned so far, SKIPPED_RANGES
+has to be revisited when unicode assigns characters there.
+"""
+from collections import deque
+from bisect import bisect_left, bisect_right
+
+MAX_CODE_POINT = 0x10ffff
+
+# Inclusive ranges skipped while paging. They must be sorted and must not touch each other.
+# tests.test_codespace checks that none of them holds a character assigned by the interpreter's unicodedata.
+SKIPPED_RANGES = (
+    (0xd800, 0xdfff),  # UTF-16 surrogates
+    (0x2fa20, 0x2ffff),  # Currently unassigned tail of the Supplementary Ideographic Plane
+    (0x40000, 0xdffff),  # Planes 4 to 13, currently unassigned
+    (0xe0080, 0xe00ff),  # Gap between tags and variation selectors supplement
+    (0xe01f0, 0xeffff),  # Currently unassigned tail of the Supplementary Special-purpose Plane
+)
+
+PLANES = (
+    "Basic Multilingual",
+    "Supplementary Multilingual",
+    "Supplementary Ideographic",
+    "Tertiary Ideographic",
+    *["Unassigned"] * 10,
+    "Supplementary Special-purpose",
+    "Supplementary Private Use Area-A",
+    "Supplementary Private Use Area-B",
+)
+
+_STARTS = [start for start, _ in SKIPPED_RANGES]
+_ENDS = [end for _, end in SKIPPED_RANGES]
+
+
+def plane(code_point: int) -> int:
+    return code_point >> 16
+
+
+def plane_name(code_point: int) -> str:
+    return PLANES[plane(code_point)]
+
+
+def is_skipped(code_point: int) -> bool:
+    index = bisect_right(_STARTS, code_point) - 1
+    return index >= 0 and code_point <= _ENDS[index]
+
+
+def next_valid(code_point: int):
+    """
+    Return the smallest displayable code point greater than or equal to code_point
+    or None if the end of the code space has been reached
+    """
+    index = bisect_right(_STARTS, code_point) - 1
+    if index >= 0 and code_point <= _ENDS[index]:
+        code_point = _ENDS[index] + 1
+    return code_point if code_point <= MAX_CODE_POINT else None
+
+
+def prev_valid(code_point: int):
+    """
+    Return the largest displayable code point less than or equal to code_point
+    or None if the start of the code space has been reached
+    """
+    index = bisect_right(_STARTS, code_point) - 1
+    if index >= 0 and code_point <= _ENDS[index]:
+        code_point = _STARTS[index] - 1
+    return code_point if code_point >= 0 else None
+
+
+def page(from_: int, count: int) -> list:
+    """
+    Collect up to count displayable code points starting at from_. Skipped ranges are jumped
+    over in a single step so the cost only depends on count.
+    """
+    code_points = []
+    code_point = next_valid(max(from_, 0))
+    while code_point is not None and len(code_points) < count:
+        index = bisect_right(_STARTS, code_point)
+        limit = _STARTS[index] - 1 if index < len(_STARTS) else MAX_CODE_POINT
+        to = min(limit, code_point + count - len(code_points) - 1)
+        code_points.extend(range(code_point, to + 1))
+        code_point = next_valid(to + 1)
+    return code_points
+
+
+def page_start_before(from_: int, count: int) -> int:
+    """
+    Find the first code point of the page of size count that ends just before from_
+    """
+    start = 0
+    code_point = prev_valid(from_ - 1)
+    while code_point is not None and count > 0:
+        index = bisect_right(_ENDS, code_point)
+        limit = _ENDS[index - 1] + 1 if index > 0 else 0
+        start = max(limit, code_point - count + 1)
+        count -= code_point - start + 1
+        code_point = prev_valid(start - 1)
+    return start
+
+
+def iterate(start: int, end: int = MAX_CODE_POINT):
+    """
+    Lazily generate displayable code points from start to end inclusive a page at a time
+    """
+    code_point = start
+    while code_point <= end:
+        code_points = page(code_point, 4096)
+        if not code_points:
+            return
+        for code_point in code_points:
+            if code_point > end:
+                return
+            yield code_point
+        code_point += 1
+
+
+class RowRing:
+    """
+    Rows of code points shown in a viewport of height rows. Scrolling only lays out the rows that
+    come into view, each with a single page call, and keeps the rows still visible.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width, self.height = width, height
+        self.rows = deque()
+
+    @property
+    def start(self):
+        return self.rows[0][0] if self.rows else None
+
+    def visible(self) -> list:
+        return [code_point for row in self.rows for code_point in row]
+
+    def reset(self, from_: int, width: int = None, height: int = None) -> None:
+        self.width = width or self.width
+        self.height = height or self.height
+        first = page(from_, self.width)
+        self.rows = deque([first] if first else [])
+        while len(self.rows) < self.height and self._append():
+            pass
+
+    def _append(self) -> bool:
+        row = page(self.rows[-1][-1] + 1, self.width)
+        if row:
+            self.rows.append(row)
+        return bool(row)
+
+    def _prepend(self) -> bool:
+        first = self.rows[0][0]
+        start = page_start_before(first, self.width)
+        if start == first:
+            return False
+        # Near the start of the code space the previous row can be shorter than width
+        row = page(start, self.width)
+        self.rows.appendleft(row[:bisect_left(row, first)])
+        return True
+
+    def _step(self, forward: bool) -> bool:
+        if forward:
+            # At the end of the code space the viewport empties down to its last row
+            if self._append() or len(self.rows) > 1:
+                self.rows.popleft()
+                return True
+            return False
+        if self._prepend():
+            if len(self.rows) > self.height:
+                self.rows.pop()
+            return True
+        return False
+
+    def scroll(self, rows: int) -> bool:
+        """
+        Move the viewport by rows (negative to scroll up)
+        :return: True if the viewport moved
+        """
+        if not self.rows:
+            return False
+        moved = False
+        for _ in range(abs(rows)):
+            if not self._step(rows > 0):
+                break
+            moved = True
+        return moved
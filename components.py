@@ -1,14 +1,27 @@
-from tkinter import Frame, Label, ttk, font, StringVar
+from tkinter import Frame, Label, Entry, ttk, font, StringVar
 from widgets import NavControl, HexadecimalIntegerControl, Grid
-import dialogs
+from threading import Thread
+from tracing import tracer
+from events import Event
+import codespace
+import fontlist
+import names
+import time
 
 
 class Component:
+    # Events the component subscribes to, the others are never delivered to it
+    events = (Event.RANGE, Event.GRID, Event.SIZE)
+    # Events delivered once the main loop is idle instead of as soon as they are published
+    deferred = ()
+    HANDLERS = {Event.RANGE: "receive_range", Event.GRID: "receive_grid", Event.SIZE: "size_changed"}
 
     def __init__(self, app):
         self.nav = Frame(app.nav, bg="#5a5a5a")
         self.app = app
         self.range = [0, 200]
+        for event in self.events:
+            app.bus.subscribe(event, getattr(self, self.HANDLERS[event]), event in self.deferred)
 
     def render(self):
         self.nav.pack(side="left")
@@ -24,15 +37,17 @@ class Component:
 
     def uninstall(self):
         self.nav.pack_forget()
+        self.app.bus.unsubscribe_owner(self)
         self.app.components.remove(self)
 
 
 class RenderRangeControl(Component):
+    events = (Event.RANGE,)
 
     def __init__(self, app):
         super().__init__(app)
         Label(self.nav, font='calibri 12', text='Code point', bg='#5a5a5a', fg='#f7f7f7').pack(side="left", padx=4)
-        self.input = HexadecimalIntegerControl(self.nav, font='calibri 12', width=6, fg="#5a5a5a", bg="#f7f7f7",
+        self.input = HexadecimalIntegerControl(self.nav, font='calibri 12', width=7, fg="#5a5a5a", bg="#f7f7f7",
                                                bd=1, relief='flat')
         self.input.pack(side="left", padx=3)
         self.input.bind('<Return>', lambda _: self.render_range())
@@ -49,7 +64,75 @@ class RenderRangeControl(Component):
         self.input.set(str(self.range[0]))
 
 
+class SearchControl(Component):
+    """
+    Find characters by name as you type. The name index is loaded in the background when the
+    component is installed. Results are paged through with Swipe and only computed a page at a time.
+    """
+    events = ()
+    DEBOUNCE_MS = 150
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.index = None
+        self._job = None
+        self.var = StringVar()
+        self.var.trace('w', self.value_changed)
+        self.input = Entry(self.nav, font='calibri 12', width=14, fg="#5a5a5a", bg="#f7f7f7", bd=1, relief='flat',
+                           textvariable=self.var)
+        self.input.pack(side="left", padx=3)
+        self.input.bind('<Return>', lambda _: self.search())
+        self.find = NavControl(self.nav, text=u'\ue721')
+        self.find.pack(side="left")
+        self.find.run = self.search
+        self.loader = Thread(target=self._load, daemon=True)
+        # Started once the window is up so it does not compete with startup
+        self.app.after_idle(self.start_loading)
+        self.render()
+
+    def start_loading(self):
+        if self.loader.ident is None:
+            self.loader.start()
+
+    def _load(self):
+        # Runs off the main loop, widgets are only touched once it is done
+        with self.app.measure("name index"):
+            self.index = names.get_index()
+
+    def value_changed(self, *_):
+        # A query still waiting to run is replaced by the new one
+        self.cancel()
+        self._job = self.app.after(self.DEBOUNCE_MS, self.search)
+
+    def cancel(self):
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+
+    def search(self):
+        self.cancel()
+        query = self.var.get()
+        if not query.strip():
+            # Drop the results of the previous query so swiping pages the code space again
+            self.app.use_results(None)
+            return
+        if self.index is None:
+            # Only the latest query is run once the index is ready
+            self.input.config(fg="#a0a0a0")
+            self._job = self.app.after(100, self.search)
+            return
+        self.input.config(fg="#5a5a5a")
+        if not self.app.render_results(names.SearchCursor(self.index.search(query))):
+            # Nothing matched, the page stays but swiping must not page the previous results
+            self.app.use_results(None)
+
+    def uninstall(self):
+        super().uninstall()
+        self.cancel()
+
+
 class GridTracker(Component):
+    events = (Event.GRID,)
 
     def __init__(self, app):
         super().__init__(app)
@@ -66,19 +149,22 @@ class GridTracker(Component):
             self.info["text"] = self.text = ""
             return
         self.text = grid.text
-        self.info["text"] = "{} : {}".format(chr(int(grid.text, 16)), grid.text.replace("0x", ""))
+        self.info["text"] = "{} : {}".format(grid.character, grid.hexadecimal)
 
 
 class RenderSizeControl(Component):
+    events = (Event.SIZE,)
 
     def __init__(self, app):
         super().__init__(app)
         self.nav['bg'] = "#5a5a5a"
         Label(self.nav, font='calibri 12', text='Width', bg='#5a5a5a', fg='#f7f7f7', width=7).grid(row=0, column=0)
         Label(self.nav, font='calibri 12', text='Height', bg='#5a5a5a', fg='#f7f7f7', width=7).grid(row=1, column=0)
-        self.width = ttk.Scale(self.nav, from_=6, to=20, length=100, orient='horizontal', command=self.change_width)
+        self.width = ttk.Scale(self.nav, from_=6, to=app.max_size[0], length=100, orient='horizontal',
+                               command=self.change_width)
         self.width.grid(row=0, column=1)
-        self.height = ttk.Scale(self.nav, from_=6, to=10, length=100, orient='horizontal', command=self.change_height)
+        self.height = ttk.Scale(self.nav, from_=6, to=app.max_size[1], length=100, orient='horizontal',
+                                command=self.change_height)
         self.height.grid(row=1, column=1)
         self.width_val = Label(self.nav, font='calibri 12', bg='#5a5a5a', fg='#f7f7f7', width=2)
         self.width_val.grid(row=0, column=2)
@@ -100,6 +186,7 @@ class RenderSizeControl(Component):
 
 
 class Swipe(Component):
+    events = ()
 
     def __init__(self, app):
         super().__init__(app)
@@ -112,42 +199,241 @@ class Swipe(Component):
         self.render()
 
     def next_render(self):
+        if self.app.results is not None:
+            self.app.render_results(self.app.results, self.app.results_offset + self.app.size[0] * self.app.size[1])
+            return
         self.app.render(self.app.current_range[-1])
 
     def prev_render(self):
-        spread = self.app.current_range
-        self.app.render(max(spread[0] - (spread[1] - spread[0]), 0))
+        size = self.app.size[0] * self.app.size[1]
+        if self.app.results is not None:
+            if self.app.results_offset > 0:
+                self.app.render_results(self.app.results, max(self.app.results_offset - size, 0))
+            return
+        self.app.render(codespace.page_start_before(self.app.current_range[0], size))
 
 
 class FontSelector(Component):
+    """
+    Font family of the grids. The font file of a family and its glyph coverage are looked up in a
+    background thread since without fontconfig that means opening every installed font once.
+    """
+    events = ()
+    DEBOUNCE_MS = 250
+    POLL_MS = 50
 
     def __init__(self, app):
         super().__init__(app)
+        self._job = None
+        # Family whose coverage should be shown and the thread looking one up
+        self.family = None
+        self.loader = None
+        self.coverage = None
         self.var = StringVar()
         self.var.trace('w', self.value_changed)
         Label(self.nav, font='calibri 11', text='font family', bg='#5a5a5a', fg='#f7f7f7', width=12).pack(side='top')
-        self.input = ttk.Combobox(self.nav, values=self._get_fonts(), style='kim.TCombobox',
+        with app.measure("font list (cached)"):
+            fonts = fontlist.load_families()
+        self.input = ttk.Combobox(self.nav, values=fonts or [], style='kim.TCombobox',
                                   width=15, textvariable=self.var)
         self.input.pack(side='top')
         self.input.set('Arial')
+        # Loading the coverage of the font can read the font file so it waits for the window to be up
+        self.app.after_idle(self.initial_font)
+        if fonts is None:
+            # Enumerating fonts is slow so it is deferred until the window is up
+            self.app.after_idle(self.load_fonts)
         self.render()
 
+    def initial_font(self):
+        self.apply_font(measured=True)
+
+    def load_fonts(self):
+        with self.app.measure("font list (enumerated)"):
+            fonts = self._get_fonts()
+        self.input["values"] = fonts
+        try:
+            fontlist.store_families(fonts)
+        except OSError:
+            pass
+
     def value_changed(self, *_):
-        for column in self.app.grids:
-            for grid in column:
-                grid['font'] = (self.input.get(), 12)
+        # Wait for typing to settle before switching fonts
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+        self._job = self.app.after(self.DEBOUNCE_MS, self.apply_font)
+
+    def apply_font(self, measured: bool = False):
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+        family = self.input.get()
+        if family != self.app.grid_family:
+            self.app.grid_font.configure(family=family)
+            # The coverage of the previous family no longer applies while the new one is looked up
+            self.app.set_coverage(None)
+        self.family = family
+        # A lookup already running picks up the latest family once it is done
+        if self.loader is None or not self.loader.is_alive():
+            self.start_loading(measured)
+
+    def start_loading(self, measured: bool = False):
+        self.loader = Thread(target=self._load, args=(self.family, measured), daemon=True)
+        self.loader.start()
+        self.app.after(self.POLL_MS, self.poll_coverage, self.family)
+
+    def _load(self, family: str, measured: bool):
+        # Runs off the main loop, widgets are only touched once it is done
+        if measured:
+            with self.app.measure("font coverage"):
+                self.coverage = self.app.coverage_cache.coverage(family)
+        else:
+            self.coverage = self.app.coverage_cache.coverage(family)
+
+    def poll_coverage(self, family: str):
+        if self.loader.is_alive():
+            self.app.after(self.POLL_MS, self.poll_coverage, family)
+        elif family != self.family:
+            # The family changed during the lookup so only the latest one is shown
+            self.start_loading()
+        else:
+            self.app.set_coverage(self.coverage)
 
     def _get_fonts(self):
-        fonts = sorted(list(font.families()))
-        fonts = list(filter(lambda x: not x.startswith("@"), fonts))
-        return fonts
+        return fontlist.filter_families(font.families())
+
+
+class Scroller(Component):
+    """
+    Continuous scrolling through the code space one column at a time with the mouse wheel, the arrow
+    and page keys or a vertical scrollbar. Grids are filled column by column so a column is the
+    smallest step that keeps the rest of the page in place. Only the columns scrolled into view are
+    laid out, the columns still visible are reused.
+    """
+    events = (Event.RANGE, Event.SIZE)
+    SEQUENCES = ('<MouseWheel>', '<Button-4>', '<Button-5>', '<Up>', '<Down>', '<Prior>', '<Next>', '<Button-1>')
+
+    def __init__(self, app):
+        super().__init__(app)
+        # Rows of the ring are the columns of the grid cluster
+        self.ring = codespace.RowRing(app.size[1], app.size[0])
+        self.bar = ttk.Scrollbar(app, orient='vertical', command=self.scrollbar_moved)
+        # The bar sits beside the body rather than over its last column
+        app.body.place_configure(width=-self.bar.winfo_reqwidth())
+        self.bar.place(relx=1, rely=0.101, relheight=0.9, anchor='ne')
+        # Bindings live on a tag shared by the body and the grids so they do not fire in the nav entries
+        self.tag = "Scroller{}".format(id(self))
+        for widget in self._widgets():
+            tags = widget.bindtags()
+            widget.bindtags(tags[:1] + (self.tag,) + tags[1:])
+        app.bind_class(self.tag, '<MouseWheel>', lambda ev: self.scroll(-1 if ev.delta > 0 else 1))
+        # X11 reports the mouse wheel as buttons 4 and 5
+        app.bind_class(self.tag, '<Button-4>', lambda ev: self.scroll(-1))
+        app.bind_class(self.tag, '<Button-5>', lambda ev: self.scroll(1))
+        app.bind_class(self.tag, '<Up>', lambda ev: self.scroll(-1))
+        app.bind_class(self.tag, '<Down>', lambda ev: self.scroll(1))
+        app.bind_class(self.tag, '<Prior>', lambda ev: self.scroll(-self.app.size[0]))
+        app.bind_class(self.tag, '<Next>', lambda ev: self.scroll(self.app.size[0]))
+        # Keys go to the focused widget so clicking the grids takes the focus away from the entries
+        app.bind_class(self.tag, '<Button-1>', lambda ev: ev.widget.focus_set())
+
+    def _widgets(self) -> list:
+        if self.app.backend == "canvas":
+            return [self.app.body, self.app.grid_canvas]
+        return [self.app.body] + [grid for column in self.app.grids for grid in column]
+
+    def render(self):
+        # Nothing to show in the nav bar
+        pass
+
+    def scroll(self, columns: int):
+        if self.ring.scroll(columns):
+            self.app.render(self.ring.start, self.ring.visible())
+
+    def scrollbar_moved(self, *args):
+        if args[0] == "moveto":
+            self.app.render(codespace.next_valid(int(float(args[1]) * codespace.MAX_CODE_POINT)) or 0)
+        else:
+            step = int(args[1])
+            self.scroll(step * self.app.size[0] if args[2] == "pages" else step)
+
+    def reset_ring(self, from_: int):
+        self.ring.reset(from_, self.app.size[1], self.app.size[0])
+
+    def receive_range(self):
+        super().receive_range()
+        size = codespace.MAX_CODE_POINT + 1
+        self.bar.set(self.range[0] / size, self.range[1] / size)
+        if self.ring.start != self.range[0]:
+            # The page was changed by other means so the ring no longer matches it
+            self.reset_ring(self.range[0])
+
+    def size_changed(self):
+        self.reset_ring(self.app.current_range[0])
+
+    def uninstall(self):
+        super().uninstall()
+        self.bar.place_forget()
+        self.app.body.place_configure(width=0)
+        for widget in self._widgets():
+            widget.bindtags(tuple(tag for tag in widget.bindtags() if tag != self.tag))
+        for sequence in self.SEQUENCES:
+            self.app.unbind_class(self.tag, sequence)
 
 
 class FavouritesManager(Component):
+    events = ()
 
     def __init__(self, app):
         super().__init__(app)
         fav = NavControl(self.nav, text="\ue735")
         fav.pack(side='right', padx=3)
-        fav.run = lambda: dialogs.ManageFavourites(app)
+        fav.run = lambda: app.open_dialog("ManageFavourites")
+        self.render()
+
+
+class PerformanceOverlay(Component):
+    """
+    Rolling render latency and event queue lag shown in the nav bar. Installing it turns tracing on.
+    Lag is how late a timer fires compared to when it was due, which is how long events wait to be handled.
+    """
+    events = ()
+    INTERVAL_MS = 250
+
+    def __init__(self, app):
+        super().__init__(app)
+        tracer.enable()
+        self.info = Label(self.nav, font='consolas 9', bg="#5a5a5a", fg="#f7f7f7", justify='left')
+        self.info.pack(side='left', padx=4)
+        self._due = None
+        self._job = None
+        self.tick()
         self.render()
+
+    def render(self):
+        self.nav.pack(side="right")
+
+    def tick(self):
+        now = time.perf_counter()
+        if self._due is not None:
+            tracer.record("event queue lag", self._due, max(now, self._due))
+        self._due = now + self.INTERVAL_MS / 1000
+        self.info["text"] = self.summary()
+        self._job = self.app.after(self.INTERVAL_MS, self.tick)
+
+    def summary(self) -> str:
+        def milliseconds(value):
+            return "{:.1f}".format(value) if value is not None else "-"
+
+        return "render p50 {} p99 {} ms\nlag p50 {} p99 {} ms".format(
+            milliseconds(tracer.percentile("render", 0.5)), milliseconds(tracer.percentile("render", 0.99)),
+            milliseconds(tracer.percentile("event queue lag", 0.5)),
+            milliseconds(tracer.percentile("event queue lag", 0.99))
+        )
+
+    def uninstall(self):
+        super().uninstall()
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+        tracer.disable()
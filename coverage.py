@@ -0,0 +1,233 @@
+"""
+Glyph coverage of installed fonts. A font's cmap table is parsed once into a bitmap of the
+code points it maps to a glyph and the bitmap is stored compressed in the cache directory,
+keyed by the font file path and modification time.
+"""
+from codespace import MAX_CODE_POINT
+from cache import cache_path
+import subprocess
+import threading
+import hashlib
+import struct
+import json
+import shutil
+import zlib
+import sys
+import os
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc")
+
+
+def font_directories():
+    if sys.platform == "win32":
+        return [os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+                os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.local/share/fonts"),
+            os.path.expanduser("~/.fonts")]
+
+
+class Coverage:
+    """
+    Bitmap over the whole code space with one bit per code point
+    """
+
+    def __init__(self, bits: bytearray = None):
+        self.bits = bits if bits is not None else bytearray((MAX_CODE_POINT >> 3) + 1)
+
+    def __contains__(self, code_point: int) -> bool:
+        return bool(self.bits[code_point >> 3] & (1 << (code_point & 7)))
+
+    def __len__(self):
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    def add(self, code_point: int) -> None:
+        self.bits[code_point >> 3] |= 1 << (code_point & 7)
+
+    def add_range(self, start: int, end: int) -> None:
+        # Inclusive range
+        for code_point in range(start, min(end, MAX_CODE_POINT) + 1):
+            self.bits[code_point >> 3] |= 1 << (code_point & 7)
+
+    def dumps(self) -> bytes:
+        return zlib.compress(bytes(self.bits))
+
+    @classmethod
+    def loads(cls, data: bytes):
+        return cls(bytearray(zlib.decompress(data)))
+
+
+def _table_offset(data: bytes, tag: bytes):
+    offset = 0
+    if data[:4] == b"ttcf":
+        # Font collection, use the first font
+        offset, = struct.unpack_from(">L", data, 12)
+    num_tables, = struct.unpack_from(">H", data, offset + 4)
+    for i in range(num_tables):
+        record = offset + 12 + i * 16
+        if data[record: record + 4] == tag:
+            return struct.unpack_from(">L", data, record + 8)[0]
+    return None
+
+
+def _parse_format_4(data: bytes, offset: int, coverage: Coverage):
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends = struct.unpack_from(">{}H".format(seg_count), data, offset + 14)
+    starts = struct.unpack_from(">{}H".format(seg_count), data, offset + 16 + seg_count * 2)
+    deltas = struct.unpack_from(">{}H".format(seg_count), data, offset + 16 + seg_count * 4)
+    range_offsets_at = offset + 16 + seg_count * 6
+    range_offsets = struct.unpack_from(">{}H".format(seg_count), data, range_offsets_at)
+    for i in range(seg_count):
+        start, end, delta, range_offset = starts[i], ends[i], deltas[i], range_offsets[i]
+        if start == 0xffff:
+            continue
+        for char in range(start, end + 1):
+            if range_offset == 0:
+                glyph = (char + delta) & 0xffff
+            else:
+                glyph_at = range_offsets_at + i * 2 + range_offset + (char - start) * 2
+                glyph = struct.unpack_from(">H", data, glyph_at)[0]
+            if glyph:
+                coverage.add(char)
+
+
+def _parse_format_12(data: bytes, offset: int, coverage: Coverage):
+    groups, = struct.unpack_from(">L", data, offset + 12)
+    for i in range(groups):
+        start, end, _ = struct.unpack_from(">3L", data, offset + 16 + i * 12)
+        coverage.add_range(start, end)
+
+
+def parse_cmap(data: bytes) -> Coverage:
+    """
+    Build the coverage of a TrueType/OpenType font (or the first font of a collection)
+    from the raw font file contents
+    """
+    coverage = Coverage()
+    cmap = _table_offset(data, b"cmap")
+    if cmap is None:
+        return coverage
+    num_tables, = struct.unpack_from(">H", data, cmap + 2)
+    subtables = {}
+    for i in range(num_tables):
+        platform, encoding, offset = struct.unpack_from(">HHL", data, cmap + 4 + i * 8)
+        subtables[(platform, encoding)] = cmap + offset
+    # Prefer full repertoire subtables over BMP only ones
+    for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0), (3, 0)):
+        if key not in subtables:
+            continue
+        offset = subtables[key]
+        table_format, = struct.unpack_from(">H", data, offset)
+        if table_format == 12:
+            _parse_format_12(data, offset, coverage)
+            return coverage
+        if table_format == 4:
+            _parse_format_4(data, offset, coverage)
+            return coverage
+    return coverage
+
+
+def _family_name(path: str):
+    try:
+        from PIL import ImageFont
+        return ImageFont.truetype(path, 12).getname()[0]
+    except (ImportError, OSError):
+        return os.path.splitext(os.path.basename(path))[0]
+
+
+class CoverageCache:
+    """
+    Resolves font families to font files and keeps their coverage both in memory and on disk.
+    Lookups may come from a background thread so they are serialised.
+    """
+
+    def __init__(self, scan_path: str = None):
+        self._lock = threading.RLock()
+        self._paths = {}
+        self._scanned = None
+        self._coverage = {}
+        self.scan_path = scan_path or cache_path("font-paths.json")
+
+    def _load_scan(self, signature: list):
+        try:
+            with open(self.scan_path, encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if cached.get("signature") != signature:
+            return None
+        return cached.get("paths")
+
+    def _scan(self) -> dict:
+        # Only used when fontconfig is unavailable. Regular styles are preferred for each family.
+        # Opening every font is slow so the map is stored until a font directory changes
+        if self._scanned is None:
+            # Imported here since fontlist imports this module
+            from fontlist import directories_signature
+            signature = directories_signature()
+            self._scanned = self._load_scan(signature)
+            if self._scanned is None:
+                self._scanned = {}
+                for directory in font_directories():
+                    for root, _, files in os.walk(directory):
+                        for file in sorted(files, key=len):
+                            if file.lower().endswith(FONT_EXTENSIONS):
+                                path = os.path.join(root, file)
+                                self._scanned.setdefault(_family_name(path).lower(), path)
+                try:
+                    with open(self.scan_path, "w", encoding="utf-8") as file:
+                        json.dump({"signature": signature, "paths": self._scanned}, file)
+                except OSError:
+                    pass
+        return self._scanned
+
+    def font_path(self, family: str):
+        with self._lock:
+            if family in self._paths:
+                return self._paths[family]
+            path = None
+            if shutil.which("fc-match"):
+                try:
+                    path = subprocess.run(["fc-match", "-f", "%{file}", family], capture_output=True,
+                                          text=True, timeout=5).stdout or None
+                except (OSError, subprocess.SubprocessError):
+                    path = None
+            if path is None:
+                path = self._scan().get(family.lower())
+            self._paths[family] = path
+            return path
+
+    def coverage(self, family: str):
+        """
+        Return the coverage of the font used for family or None if it cannot be determined
+        """
+        with self._lock:
+            path = self.font_path(family)
+            if path is None:
+                return None
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                return None
+            key = hashlib.sha1("{}:{}".format(path, mtime).encode("utf-8")).hexdigest()
+            if key in self._coverage:
+                return self._coverage[key]
+            stored = cache_path("coverage-{}.bin".format(key))
+            try:
+                with open(stored, "rb") as file:
+                    coverage = Coverage.loads(file.read())
+            except (OSError, zlib.error):
+                try:
+                    with open(path, "rb") as file:
+                        coverage = parse_cmap(file.read())
+                except (OSError, struct.error):
+                    # Unreadable or truncated font file
+                    return None
+                try:
+                    with open(stored, "wb") as file:
+                        file.write(coverage.dumps())
+                except OSError:
+                    pass
+            self._coverage[key] = coverage
+            return coverage
@@ -1,9 +1,10 @@
-from tkinter import Toplevel, Label, Frame, ttk, filedialog, TclError, messagebox
-from widgets import KeyValueLabel, ScrolledGridHolder, Grid, ContextMenu
+from tkinter import Toplevel, Label, Frame, ttk, filedialog, TclError, messagebox, IntVar
+from widgets import KeyValueLabel, VirtualGridHolder, Grid, ContextMenu, HexadecimalIntegerControl
+from events import EventBus, Event
+from threading import Thread
 import components
-import sys
-if sys.platform == "win32" or sys.platform == "darwin":
-    from PIL import ImageGrab
+import glyphs
+import export
 import os
 
 
@@ -21,7 +22,8 @@ def center_window(parent, child):
 
 
 def local_picture_location():
-    return os.path.join(os.environ['HOMEDRIVE'], os.environ["HOMEPATH"], "Pictures")
+    pictures = os.path.join(os.path.expanduser("~"), "Pictures")
+    return pictures if os.path.isdir(pictures) else os.path.expanduser("~")
 
 
 class BaseDialog(Toplevel):
@@ -52,6 +54,22 @@ class BaseDialog(Toplevel):
         self.bind('<Configure>', lambda _: self.center())
         self.event_generate('<Configure>')
 
+    def show_glyph(self, label: Label, size: int, fg: str) -> None:
+        """
+        Display the grid's character as a cached rasterized glyph keeping the label's text size.
+        The label keeps showing text if the glyph cannot be rasterized.
+        :param label: label currently displaying the character as text
+        :param size: font size in points
+        :param fg: glyph colour
+        :return:
+        """
+        pixels = round(self.winfo_fpixels("{}p".format(size)))
+        image = self.app.glyph_cache.get(self.grid.code_point, self.grid.font, pixels, fg)
+        if image is not None:
+            # Hold a reference so the image outlives its eviction from the cache while displayed
+            label.image = image
+            label.config(image=image, width=label.winfo_reqwidth(), height=label.winfo_reqheight())
+
     def center(self):
         if not self.centered:
             center_window(self.app, self)
@@ -63,8 +81,10 @@ class UnicodeInfo(BaseDialog):
     def __init__(self, app):
         super().__init__(app)
         self.data = data = self.grid.data
-        Label(self.body, font=(self.grid.font, 28), bg="#5a5a5a", text=self.grid['text'],
-              width=5, height=2, fg='#f7f7f7').grid(row=0, column=0, rowspan=len(data), sticky='nesw', padx=5, pady=5)
+        glyph = Label(self.body, font=(self.grid.font, 28), bg="#5a5a5a", text=self.grid.character,
+                      width=5, height=2, fg='#f7f7f7')
+        glyph.grid(row=0, column=0, rowspan=len(data), sticky='nesw', padx=5, pady=5)
+        self.show_glyph(glyph, 28, '#f7f7f7')
         # Render the grids data
         row = 1
         for key in data:
@@ -75,7 +95,7 @@ class UnicodeInfo(BaseDialog):
         close = ttk.Button(self.button_holder, text="Close", command=self.destroy)
         close.pack(side='top', pady=5)
 
-        self.title("Info for {}".format(self.grid.text.replace("0x", "")))
+        self.title("Info for {}".format(self.grid.hexadecimal))
 
 
 class SaveAsImage(BaseDialog):
@@ -83,34 +103,44 @@ class SaveAsImage(BaseDialog):
     def __init__(self, app):
         super().__init__(app)
         self.image_label = Label(self.body, font=(self.grid.font, 60), fg="#5a5a5a", bg="#f7f7f7",
-                                 width=4, height=2, text=self.grid['text'])
+                                 width=4, height=2, text=self.grid.character)
         self.image_label.pack(side='top', padx=5, pady=5)
+        self.show_glyph(self.image_label, 60, '#5a5a5a')
 
         ttk.Button(self.button_holder, text="copy").pack(side='left', padx=5, pady=5)
+        # Export size in points and resolution in dots per inch
+        self.export_size = IntVar(self, 60)
+        self.dpi = IntVar(self, 96)
+        Label(self.button_holder, text="Size").pack(side='left', padx=2)
+        ttk.Spinbox(self.button_holder, from_=8, to=1024, width=5,
+                    textvariable=self.export_size).pack(side='left', pady=5)
+        Label(self.button_holder, text="DPI").pack(side='left', padx=2)
+        ttk.Spinbox(self.button_holder, from_=72, to=1200, increment=24, width=5,
+                    textvariable=self.dpi).pack(side='left', pady=5)
         ttk.Button(self.button_holder, text="Save", command=self.save).pack(side='left', padx=5, pady=5)
         ttk.Button(self.button_holder, text="Cancel", command=self.destroy).pack(side='left', padx=5, pady=5)
         self.image = None
         self.title("Save as image")
 
-    def snip_img(self):
-        if sys.platform not in ("win32", "darwin"):
+    def render_image(self):
+        # The glyph is rasterized directly from the font file so the dialog need not be visible
+        self.image = None
+        font_path = self.app.glyph_cache.font_path(self.grid.font)
+        if glyphs.Image is None or font_path is None:
             messagebox.showerror(
                 "Feature not supported",
-                "This feature is only supported in windows and Mac OS"
+                "Could not find the font file for {}".format(self.grid.font)
             )
             return
-        self.update_idletasks()
-        self.body.update_idletasks()
-        self.image_label.update_idletasks()
-        x1 = self.image_label.winfo_rootx()
-        y1 = self.image_label.winfo_rooty()
-        x2 = self.image_label.winfo_width() + x1
-        y2 = self.image_label.winfo_height() + y1
-        image = ImageGrab.grab((x1, y1, x2, y2))
-        self.image = image
+        try:
+            size, dpi = self.export_size.get(), self.dpi.get()
+        except TclError:
+            messagebox.showerror("Invalid size", "Size and DPI must be whole numbers")
+            return
+        self.image = glyphs.render_glyph(self.grid.code_point, font_path, size, dpi)
 
     def save(self):
-        self.snip_img()
+        self.render_image()
         if self.image is None:
             return
         path = filedialog.asksaveasfilename(parent=self, initialfile="unicd.png",
@@ -121,21 +151,90 @@ class SaveAsImage(BaseDialog):
             head, file = os.path.split(path)
             file = file if len(file.split(".")) > 1 else file + ".png"
             path = os.path.join(head, file)
-            self.image.save(path)
+            self.image.save(path, dpi=self.image.info["dpi"])
             self.destroy()
 
 
+class ExportSheet(BaseDialog):
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.start = self._add_field("First code point", HexadecimalIntegerControl, 0)
+        self.end = self._add_field("Last code point", HexadecimalIntegerControl, 1)
+        self.glyph_size = IntVar(self, 32)
+        self._add_field("Glyph size", lambda master, **cnf: ttk.Spinbox(
+            master, from_=8, to=256, textvariable=self.glyph_size, **cnf), 2)
+        self.start.set(str(app.current_range[0]))
+        self.end.set(str(app.current_range[1] - 1))
+        self.export_button = ttk.Button(self.button_holder, text="Export", command=self.export)
+        self.export_button.pack(side='left', padx=5, pady=5)
+        ttk.Button(self.button_holder, text="Cancel", command=self.destroy).pack(side='left', padx=5, pady=5)
+        self.worker = None
+        self.error = None
+        self.title("Export sheet")
+
+    def _add_field(self, label, widget_class, row):
+        Label(self.body, text=label, bg="#f7f7f7", fg="#5a5a5a", font=('calibri', 11),
+              anchor='w').grid(row=row, column=0, sticky='ew', padx=5, pady=3)
+        widget = widget_class(self.body, width=8)
+        widget.grid(row=row, column=1, padx=5, pady=3)
+        return widget
+
+    def export(self):
+        font_path = self.app.glyph_cache.font_path(self.grid.font)
+        if glyphs.Image is None or font_path is None:
+            messagebox.showerror("Feature not supported", "Could not find the font file for {}".format(self.grid.font))
+            return
+        path = filedialog.asksaveasfilename(parent=self, initialfile="sheet.png",
+                                            filetypes=[("Portable Network Graphics", "*.png")],
+                                            initialdir=local_picture_location())
+        if path:
+            self.start_export(font_path, path)
+
+    def start_export(self, font_path: str, path: str) -> None:
+        try:
+            size = self.glyph_size.get()
+        except TclError:
+            messagebox.showerror("Invalid glyph size", "The glyph size must be a whole number", parent=self)
+            return
+        self.export_button.config(state='disabled')
+        self.error = None
+        # Rasterization is spread over processes by the exporter, this thread only waits for it
+        self.worker = Thread(target=self._export, daemon=True,
+                             args=(self.start.get(), self.end.get(), font_path, path), kwargs={"size": size})
+        self.worker.start()
+        self.after(100, self._poll)
+
+    def _export(self, start: int, end: int, font_path: str, path: str, size: int):
+        try:
+            export.export_atlas(start, end, font_path, path, size=size)
+        except Exception as error:
+            self.error = error
+
+    def _poll(self):
+        if self.worker.is_alive():
+            self.after(100, self._poll)
+            return
+        if self.error is not None:
+            messagebox.showerror("Export failed", str(self.error), parent=self)
+            self.export_button.config(state='normal')
+            return
+        self.destroy()
+
+
 class ManageFavourites(BaseDialog):
 
     def __init__(self, app):
         super().__init__(app)
+        self.bus = EventBus(self)
         self.nav = Frame(self.body, bg="#5a5a5a", height=40)
         self.nav.pack(side='top', fill='x', expand=True)
-        self.body = ScrolledGridHolder(self.body, height=230, width=400, bg='#f7f7f7')
-        self.body.pack(side='top')
-        self.body = self.body.body
+        self.holder = VirtualGridHolder(self.body, lambda: Grid(self), self._bind_grid, width=400, bg='#f7f7f7')
+        self.holder.pack(side='top')
+        self.body = self.holder.body
         self.body.bind('<Leave>', lambda ev: self.deactivate_grid())
-        self.grids = []
+        self.favourites = []
+        self.glyph_cache = app.glyph_cache
         self.active_grid = None
         self.load_favourites()
         self.title("Favourites")
@@ -163,53 +262,35 @@ class ManageFavourites(BaseDialog):
             self.context_menu.grab_release()
 
     def activate_grid(self, grid: Grid):
-        for component in self.components:
-            component.receive_grid(grid)
+        self.bus.publish(Event.GRID, grid)
 
     def deactivate_grid(self):
-        for component in self.components:
-            component.receive_grid(self.active_grid)
+        self.bus.publish(Event.GRID, self.active_grid)
+
+    @property
+    def grids(self) -> list:
+        # Only grids within the viewport exist, they are recycled as the user scrolls
+        return self.holder.visible_cells
 
     def remove(self):
-        with self.app.get_favourites() as data:
-            fav = data["favourites"]
-            fav.remove((self.active_grid.code_point, self.active_grid.font))
-            data["favourites"] = fav
-        self.active_grid.place_forget()
-        self.grids.remove(self.active_grid)
-        self.active_grid = None
-        self._re_place()
+        self.app.favourites.remove(self.active_grid.code_point, self.active_grid.font)
+        grid = self.active_grid
+        grid.unlock()
+        self.holder.remove(grid)
 
     def clear_favourites(self):
         self.app.set_favourites([])
-        for grid in self.grids:
-            grid.place_forget()
-        self.grids = []
+        self.load_favourites()
 
     def get_favourites(self):
         return self.app.favourites_as_list()
 
-    def _re_place(self):
-        row, column, max_h = 0, 0, 6
-        for grid in self.grids:
-            grid.place(x=column * 40, y=row * 40, width=40, height=40)
-            if row == max_h - 1:
-                column += 1
-                row = 0
-            else:
-                row += 1
-        self.body.config(width=(column + 1) * 40, height=max_h * 40)
+    def _bind_grid(self, grid: Grid, favourite):
+        if grid.is_locked:
+            grid.unlock()
+        grid.repaint(font=(favourite[1], 12))
+        grid.set(favourite[0])
 
     def load_favourites(self):
-        row, column, max_h = 0, 0, 6
-        for grid_config in self.get_favourites():
-            grid = Grid(self, font=(grid_config[1], 12))
-            grid.set(grid_config[0])
-            self.grids.append(grid)
-            grid.place(x=column*40, y=row*40, width=40, height=40)
-            if row == max_h - 1:
-                column += 1
-                row = 0
-            else:
-                row += 1
-        self.body.config(width=(column+1)*40, height=max_h*40)
+        self.favourites = self.get_favourites()
+        self.holder.load(self.favourites)
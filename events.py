@@ -0,0 +1,116 @@
+"""
+Event bus connecting the app to its components. Each event type keeps its own list of subscribers so
+publishing an event only calls the handlers interested in it. Handlers can ask for their calls to be
+deferred to the next idle moment of the Tk main loop, in which case only the latest call is delivered.
+"""
+from tracing import tracer
+from enum import Enum
+import time
+
+
+class Event(Enum):
+    # Displayed range changed, handlers take no arguments
+    RANGE = "range"
+    # Hovered or locked grid changed, handlers receive the grid or None
+    GRID = "grid"
+    # Grid size changed, handlers take no arguments
+    SIZE = "size"
+
+
+_SPAN_NAMES = {event: "{} event".format(event.value) for event in Event}
+
+
+def handler_name(handler) -> str:
+    owner = getattr(handler, "__self__", None)
+    if owner is not None:
+        return "{}.{}".format(type(owner).__name__, handler.__name__)
+    return getattr(handler, "__qualname__", repr(handler))
+
+
+class HandlerStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def __repr__(self):
+        return "HandlerStats(calls={}, mean={:.3f} ms, worst={:.3f} ms)".format(
+            self.calls, self.mean * 1000, self.worst * 1000
+        )
+
+
+class EventBus:
+
+    def __init__(self, master):
+        """
+        :param master: Tk widget whose main loop runs deferred handlers
+        """
+        self.master = master
+        self._subscribers = {event: [] for event in Event}
+        # Deferred handlers waiting to run mapped to the arguments of their latest call
+        self._pending = {}
+        self._job = None
+        # Time spent in each handler keyed by handler name
+        self.stats = {}
+
+    def subscribe(self, event: Event, handler, deferred: bool = False) -> None:
+        stats = self.stats.setdefault(handler_name(handler), HandlerStats())
+        self._subscribers[event].append((handler, deferred, stats))
+
+    def unsubscribe(self, event: Event, handler) -> None:
+        self._subscribers[event] = [entry for entry in self._subscribers[event] if entry[0] != handler]
+        self._pending.pop(handler, None)
+
+    def unsubscribe_owner(self, owner) -> None:
+        """
+        Remove every handler bound to owner
+        """
+        for event in Event:
+            for handler, _, _ in list(self._subscribers[event]):
+                if getattr(handler, "__self__", None) is owner:
+                    self.unsubscribe(event, handler)
+
+    def subscribers(self, event: Event) -> list:
+        return [handler for handler, _, _ in self._subscribers[event]]
+
+    def publish(self, event: Event, *args) -> None:
+        with tracer.span(_SPAN_NAMES[event]):
+            for handler, deferred, stats in self._subscribers[event]:
+                if deferred:
+                    self._pending[handler] = (args, stats)
+                    if self._job is None:
+                        self._job = self.master.after_idle(self._deliver)
+                else:
+                    self._call(handler, args, stats)
+
+    def _deliver(self) -> None:
+        self._job = None
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Run deferred handlers now
+        """
+        if self._job is not None:
+            self.master.after_cancel(self._job)
+            self._job = None
+        pending, self._pending = self._pending, {}
+        for handler, (args, stats) in pending.items():
+            self._call(handler, args, stats)
+
+    @staticmethod
+    def _call(handler, args, stats: HandlerStats) -> None:
+        start = time.perf_counter()
+        try:
+            handler(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.calls += 1
+            stats.total += elapsed
+            if elapsed > stats.worst:
+                stats.worst = elapsed
@@ -0,0 +1,83 @@
+"""
+Bulk export of glyph sheets. All glyphs of a code point range are rasterized into a tiled atlas
+image together with a JSON index mapping every code point to its cell rectangle. Rows of the atlas
+are rasterized in parallel by a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from coverage import parse_cmap
+import codespace
+import glyphs
+import multiprocessing
+import json
+import os
+
+DEFAULT_COLUMNS = 32
+
+
+def code_points_in(start: int, end: int, coverage=None):
+    """
+    Generate displayable code points from start to end inclusive, optionally only the ones covered by a font
+    """
+    for code_point in codespace.iterate(start, end):
+        if coverage is None or code_point in coverage:
+            yield code_point
+
+
+def _render_row(task):
+    # Runs in worker processes so it only receives picklable arguments
+    code_points, font_path, pixels, cell, fg, bg = task
+    row = glyphs.Image.new("RGBA", (cell * len(code_points), cell), bg or (0, 0, 0, 0))
+    for index, code_point in enumerate(code_points):
+        glyph = glyphs.rasterize(code_point, font_path, pixels, fg)
+        # Glyphs are centered within their cell and cropped if they overflow it
+        left, top = max((glyph.width - cell) // 2, 0), max((glyph.height - cell) // 2, 0)
+        glyph = glyph.crop((left, top, left + min(glyph.width, cell), top + min(glyph.height, cell)))
+        row.alpha_composite(glyph, (index * cell + (cell - glyph.width) // 2, (cell - glyph.height) // 2))
+    return row.tobytes(), row.size
+
+
+def export_atlas(start: int, end: int, font_path: str, image_path: str, index_path: str = None, size: int = 32,
+                 columns: int = DEFAULT_COLUMNS, covered_only: bool = True, fg="#000000", bg=None, workers=None):
+    """
+    Export the glyphs of a range into a tiled atlas
+    :param start: first code point
+    :param end: last code point (inclusive)
+    :param font_path: font file to rasterize with
+    :param image_path: destination of the atlas PNG
+    :param index_path: destination of the JSON index, defaults to image_path with a .json extension
+    :param size: glyph size in pixels
+    :param columns: number of glyphs per atlas row
+    :param covered_only: skip code points the font has no glyph for
+    :param workers: number of processes, defaults to the number of cores
+    :return: index as written to index_path
+    """
+    if glyphs.Image is None:
+        raise RuntimeError("Pillow is required to export glyph sheets")
+    coverage = None
+    if covered_only:
+        with open(font_path, "rb") as file:
+            coverage = parse_cmap(file.read())
+    code_points = list(code_points_in(start, end, coverage))
+    cell = size + size // 2
+    rows = [code_points[i: i + columns] for i in range(0, len(code_points), columns)]
+    atlas = glyphs.Image.new("RGBA", (cell * min(columns, max(len(code_points), 1)), cell * max(len(rows), 1)),
+                             bg or (0, 0, 0, 0))
+    tasks = [(row, font_path, size, cell, fg, bg) for row in rows]
+    # Exports run from a thread of the viewer and forking a process that has Tk and threads running is unsafe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for y, (data, row_size) in enumerate(pool.map(_render_row, tasks, chunksize=max(len(tasks) // 64, 1))):
+            atlas.paste(glyphs.Image.frombytes("RGBA", row_size, data), (0, y * cell))
+    atlas.save(image_path)
+    index = {
+        "font": font_path,
+        "size": size,
+        "cell": [cell, cell],
+        "glyphs": {
+            "{:04x}".format(code_point): [(i % columns) * cell, (i // columns) * cell, cell, cell]
+            for i, code_point in enumerate(code_points)
+        }
+    }
+    index_path = index_path or os.path.splitext(image_path)[0] + ".json"
+    with open(index_path, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    return index
@@ -0,0 +1,181 @@
+"""
+Favourites store backed by sqlite. Each favourite is a (code_point, font) pair kept unique by an
+index. The favourites are loaded once into memory where all reads are answered. Changes apply to
+memory immediately and are written to the database in the background.
+"""
+from urllib.parse import quote
+import threading
+import traceback
+import sqlite3
+import shelve
+import atexit
+import queue
+import dbm
+import os
+from tracing import span
+
+FAVOURITES_PATH = "favourites.db"
+
+_INSERT = "INSERT OR IGNORE INTO favourites (code_point, font) VALUES (?, ?)"
+_DELETE = "DELETE FROM favourites WHERE code_point = ? AND font = ?"
+# Stored as the database user_version once the legacy shelve file has been looked at
+SHELVE_MIGRATED = 1
+
+
+class FavouritesStore:
+
+    def __init__(self, path: str = FAVOURITES_PATH):
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS favourites ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "code_point INTEGER NOT NULL, "
+                "font TEXT NOT NULL, "
+                "UNIQUE (code_point, font))"
+            )
+        # Dictionaries keep insertion order so they double as an ordered set
+        self._favourites = dict.fromkeys(tuple(row) for row in self._connection.execute(
+            "SELECT code_point, font FROM favourites ORDER BY id"
+        ))
+        self.migrated = self._connection.execute("PRAGMA user_version").fetchone()[0] >= SHELVE_MIGRATED
+        # Statements waiting to be written as (sql, parameters, many)
+        self._journal = queue.Queue()
+        self._writer = threading.Thread(target=self._write_behind, daemon=True)
+        self._writer.start()
+
+    def _write_behind(self):
+        while True:
+            batch = [self._journal.get()]
+            while not self._journal.empty():
+                batch.append(self._journal.get_nowait())
+            closing = batch[-1] is None
+            statements = [statement for statement in batch if statement is not None]
+            try:
+                # Everything queued so far is written in a single transaction
+                with span("favourites write"), self._connection:
+                    for sql, parameters, many in statements:
+                        if many:
+                            self._connection.executemany(sql, parameters)
+                        else:
+                            self._connection.execute(sql, parameters)
+            except sqlite3.Error:
+                # Memory is authoritative, a failed write must not stop later ones
+                traceback.print_exc()
+            finally:
+                for _ in batch:
+                    self._journal.task_done()
+            if closing:
+                return
+
+    def _write(self, sql: str, parameters=(), many: bool = False) -> None:
+        self._journal.put((sql, parameters, many))
+
+    def __contains__(self, favourite) -> bool:
+        return tuple(favourite) in self._favourites
+
+    def __len__(self):
+        return len(self._favourites)
+
+    def __iter__(self):
+        return iter(self.as_list())
+
+    def as_list(self) -> list:
+        # Favourites are listed in the order they were added
+        with self._lock:
+            return list(self._favourites)
+
+    def add(self, code_point: int, font: str) -> None:
+        with self._lock:
+            if (code_point, font) not in self._favourites:
+                self._favourites[(code_point, font)] = None
+                self._write(_INSERT, (code_point, font))
+
+    def remove(self, code_point: int, font: str) -> None:
+        with self._lock:
+            if (code_point, font) in self._favourites:
+                del self._favourites[(code_point, font)]
+                self._write(_DELETE, (code_point, font))
+
+    def toggle(self, code_point: int, font: str) -> bool:
+        """
+        Add the favourite if absent otherwise remove it
+        :return: True if the favourite was added
+        """
+        with self._lock:
+            if (code_point, font) in self._favourites:
+                self.remove(code_point, font)
+                return False
+            self.add(code_point, font)
+            return True
+
+    def replace(self, favourites) -> None:
+        with self._lock:
+            self._favourites = dict.fromkeys(tuple(favourite) for favourite in favourites)
+            self._write("DELETE FROM favourites")
+            self._write(_INSERT, list(self._favourites), many=True)
+
+    def clear(self) -> None:
+        self.replace([])
+
+    def mark_migrated(self) -> None:
+        with self._lock:
+            if not self.migrated:
+                self.migrated = True
+                self._write("PRAGMA user_version = {}".format(SHELVE_MIGRATED))
+
+    def flush(self) -> None:
+        # Block until every change has been written to the database
+        self._journal.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._journal.put(None)
+            self._writer.join()
+            self._connection.close()
+
+
+_store = None
+
+
+def get_store() -> FavouritesStore:
+    # The store is shared by the whole process so membership stays hot between uses
+    global _store
+    if _store is None:
+        _store = FavouritesStore()
+        migrate_shelve(_store)
+        atexit.register(_store.close)
+    return _store
+
+
+def migrate_shelve(store: FavouritesStore, path: str = "data") -> None:
+    # Import favourites saved by older versions which kept them in a shelve file. This is only tried
+    # once per database so favourites cleared afterwards are not imported again on the next start.
+    if store.migrated:
+        return
+    try:
+        with shelve.open(path, flag="r") as data:
+            favourites = data.get("favourites")
+    except dbm.error:
+        favourites = None
+    if favourites and not len(store):
+        store.replace(favourites)
+    store.mark_migrated()
+
+
+def load_favourites(path: str = FAVOURITES_PATH) -> list:
+    """
+    Favourites in the order they were added, read without creating or changing the database
+    :return: an empty list if there is no database yet
+    """
+    try:
+        connection = sqlite3.connect("file:{}?mode=ro".format(quote(os.path.abspath(path))), uri=True)
+    except sqlite3.Error:
+        return []
+    try:
+        return [tuple(row) for row in connection.execute("SELECT code_point, font FROM favourites ORDER BY id")]
+    except sqlite3.Error:
+        return []
+    finally:
+        connection.close()
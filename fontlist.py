@@ -0,0 +1,46 @@
+"""
+Persisted list of installed font families. Enumerating families through Tk is slow on machines
+with many fonts so the sorted list is cached and only rebuilt when a font directory changes.
+"""
+from coverage import font_directories
+from cache import cache_path
+import json
+import os
+
+FONTCONFIG_DIRECTORIES = ["/etc/fonts", "/var/cache/fontconfig", os.path.expanduser("~/.cache/fontconfig")]
+
+
+def directories_signature() -> list:
+    # Modification times of every font directory. Adding or removing a font changes at least one of them
+    signature = []
+    for directory in font_directories() + FONTCONFIG_DIRECTORIES:
+        for root, _, _ in os.walk(directory):
+            try:
+                signature.append([root, os.path.getmtime(root)])
+            except OSError:
+                pass
+    return signature
+
+
+def filter_families(families) -> list:
+    # Vertical variants of fonts are prefixed with '@' on windows
+    return sorted(family for family in families if not family.startswith("@"))
+
+
+def load_families(path: str = None):
+    """
+    Return the cached family list or None if the cache is missing or out of date
+    """
+    try:
+        with open(path or cache_path("families.json"), encoding="utf-8") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if cached.get("signature") != directories_signature():
+        return None
+    return cached.get("families")
+
+
+def store_families(families: list, path: str = None) -> None:
+    with open(path or cache_path("families.json"), "w", encoding="utf-8") as file:
+        json.dump({"signature": directories_signature(), "families": families}, file)
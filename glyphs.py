@@ -0,0 +1,131 @@
+"""
+Offscreen glyph rasterization with Pillow. Rasterized glyphs are kept as PhotoImage objects in an
+LRU cache bounded by a byte budget so characters that are shown again are not rasterized again.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+DEFAULT_BUDGET = 16 * 1024 * 1024
+
+
+@lru_cache(maxsize=32)
+def load_font(path: str, size: int):
+    return ImageFont.truetype(path, size)
+
+
+def rasterize(code_point: int, font_path: str, size: int, fg="#5a5a5a", bg=None, padding: int = 0):
+    """
+    Draw a single glyph tightly cropped to its bounding box
+    :param code_point: code point to draw
+    :param font_path: path of the font file
+    :param size: font size in pixels
+    :param fg: glyph colour
+    :param bg: background colour, None for a transparent background
+    :param padding: pixels added around the bounding box
+    :return: RGBA image of the glyph
+    """
+    font = load_font(font_path, size)
+    text = chr(code_point)
+    if hasattr(font, "getbbox"):
+        left, top, right, bottom = font.getbbox(text)
+    else:
+        # Pillow versions older than 8.0
+        (right, bottom), (left, top) = font.getsize(text), font.getoffset(text)
+    width, height = max(right - left, 1) + 2 * padding, max(bottom - top, 1) + 2 * padding
+    image = Image.new("RGBA", (width, height), bg or (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((padding - left, padding - top), text, font=font, fill=fg)
+    return image
+
+
+def render_glyph(code_point: int, font_path: str, size: int, dpi: int = 96, fg="#5a5a5a", bg="#f7f7f7"):
+    """
+    Render a glyph for export without any screen round trip
+    :param size: font size in points
+    :param dpi: resolution used to convert points to pixels, stored in the image metadata
+    :return: RGBA image of the glyph padded by a quarter of its size
+    """
+    pixels = max(round(size * dpi / 72), 1)
+    image = rasterize(code_point, font_path, pixels, fg, bg, padding=pixels // 4)
+    image.info["dpi"] = (dpi, dpi)
+    return image
+
+
+class GlyphCache:
+    """
+    LRU cache of rasterized glyphs keyed by (code point, font family, size, colour)
+    """
+
+    def __init__(self, master, font_path, budget: int = DEFAULT_BUDGET):
+        """
+        :param master: Tk widget owning the images
+        :param font_path: callable resolving a font family to its font file or None
+        :param budget: maximum number of bytes held by cached images
+        """
+        self.master = master
+        self.font_path = font_path
+        self._budget = budget
+        self._images = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @budget.setter
+    def budget(self, value: int):
+        self._budget = value
+        self._evict()
+
+    def __len__(self):
+        return len(self._images)
+
+    def _evict(self):
+        while self.bytes > self._budget and self._images:
+            _, (_, cost) = self._images.popitem(last=False)
+            self.bytes -= cost
+            self.evictions += 1
+
+    def get(self, code_point: int, family: str, size: int, fg="#5a5a5a"):
+        """
+        Return a PhotoImage of the glyph or None if it cannot be rasterized
+        in which case callers should fall back to drawing text.
+        """
+        key = (code_point, family, size, fg)
+        if key in self._images:
+            self.hits += 1
+            self._images.move_to_end(key)
+            return self._images[key][0]
+        self.misses += 1
+        path = self.font_path(family)
+        if Image is None or path is None:
+            return None
+        try:
+            image = rasterize(code_point, path, size, fg)
+        except OSError:
+            return None
+        cost = image.width * image.height * 4
+        # ImageTk pulls in tkinter which headless users of this module must not pay for
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(image, master=self.master)
+        self._images[key] = (photo, cost)
+        self.bytes += cost
+        self._evict()
+        return photo
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._images), "bytes": self.bytes, "budget": self._budget,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions
+        }
+
+    def clear(self):
+        self._images.clear()
+        self.bytes = 0
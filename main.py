@@ -1,5 +1,53 @@
-from app import App
+import time
+started = time.perf_counter()
 
+from app import App, MAX_GRID_WIDTH, MAX_GRID_HEIGHT  # noqa: E402
+from tracing import tracer  # noqa: E402
+import components  # noqa: E402
+import argparse  # noqa: E402
 
-root = App()
-root.mainloop()
+imported = time.perf_counter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unicode viewer")
+    parser.add_argument("--backend", choices=("labels", "canvas"), default="labels",
+                        help="draw grids as label widgets or on a single canvas")
+    parser.add_argument("--max-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"),
+                        default=(MAX_GRID_WIDTH, MAX_GRID_HEIGHT), help="maximum number of grids")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print the time spent in each phase of startup once the window is up")
+    parser.add_argument("--overlay", action="store_true", help="show render latency and event queue lag")
+    parser.add_argument("--trace", metavar="PATH", help="write timing spans as a Chrome trace on exit")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.enable()
+    root = App(backend=args.backend, max_size=args.max_size)
+    root.startup_timings["imports"] = (imported - started) * 1000
+    reported = False
+
+    def report_startup():
+        for phase, milliseconds in root.startup_timings.items():
+            print("{:<28}{:>9.1f} ms".format(phase, milliseconds))
+
+    def on_map(event):
+        # Work deferred during startup is queued as idle callbacks so the report is queued after it
+        nonlocal reported
+        if event.widget is root and not reported:
+            reported = True
+            root.after_idle(report_startup)
+
+    if args.profile_startup:
+        root.bind('<Map>', on_map, add=True)
+    if args.overlay:
+        root.components.append(components.PerformanceOverlay(root))
+
+    root.mainloop()
+    if args.trace:
+        tracer.export(args.trace)
+
+
+# Export workers are spawned and import this script again, they must not open a window of their own
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Precomputed unicode metadata index. Blocks are kept as sorted start/end arrays so looking up
+the metadata of a code point is a single bisect no matter how many code points are queried.
+The metadata of every code point is also written once to a binary database in the cache directory
+which is memory mapped so lookups read it in place and the pages are shared between processes.
+"""
+from bisect import bisect_right
+from collections import namedtuple
+from cache import cache_path
+import unicodedata
+import tempfile
+import warnings
+import struct
+import re
+import mmap
+import os
+import codespace
+
+BLOCKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "Blocks.txt")
+
+CATEGORIES = {
+    "Lu": "Uppercase Letter", "Ll": "Lowercase Letter", "Lt": "Titlecase Letter", "Lm": "Modifier Letter",
+    "Lo": "Other Letter", "Mn": "Nonspacing Mark", "Mc": "Spacing Mark", "Me": "Enclosing Mark",
+    "Nd": "Decimal Number", "Nl": "Letter Number", "No": "Other Number", "Pc": "Connector Punctuation",
+    "Pd": "Dash Punctuation", "Ps": "Open Punctuation", "Pe": "Close Punctuation", "Pi": "Initial Punctuation",
+    "Pf": "Final Punctuation", "Po": "Other Punctuation", "Sm": "Math Symbol", "Sc": "Currency Symbol",
+    "Sk": "Modifier Symbol", "So": "Other Symbol", "Zs": "Space Separator", "Zl": "Line Separator",
+    "Zp": "Paragraph Separator", "Cc": "Control", "Cf": "Format", "Cs": "Surrogate", "Co": "Private Use",
+    "Cn": "Unassigned",
+}
+
+# First line of the block table, e.g. "# Blocks-14.0.0.txt"
+_BLOCKS_HEADER = re.compile(r"#\s*Blocks-(\d+(?:\.\d+)*)\.txt")
+
+CharacterInfo = namedtuple("CharacterInfo", "code_point name block plane category surrogate_pair")
+
+
+def _version(text: str) -> tuple:
+    return tuple(int(part) for part in text.split("."))
+
+
+def blocks_version(path: str = BLOCKS_PATH):
+    """
+    Unicode version of a block table as given by its header or None if it has none
+    """
+    with open(path, encoding="utf-8") as blocks:
+        match = _BLOCKS_HEADER.match(blocks.readline())
+    return match.group(1) if match else None
+
+
+def surrogate_pair(code_point: int):
+    """
+    UTF-16 surrogate pair of a supplementary code point or None for the Basic Multilingual Plane
+    """
+    if code_point < 0x10000:
+        return None
+    offset = code_point - 0x10000
+    return 0xd800 + (offset >> 10), 0xdc00 + (offset & 0x3ff)
+
+
+class UnicodeIndex:
+
+    def __init__(self, path: str = BLOCKS_PATH):
+        self._starts = []
+        self._ends = []
+        self._names = []
+        # The block table ships with the viewer while unicodedata comes with the interpreter. Characters
+        # added after the table's version are reported as "No Block" until resources/Blocks.txt is updated.
+        self.version = blocks_version(path)
+        if self.version is None or _version(self.version) < _version(unicodedata.unidata_version):
+            warnings.warn("Block table is from Unicode {} but unicodedata is {}, newer characters have no block"
+                          .format(self.version, unicodedata.unidata_version), RuntimeWarning)
+        with open(path, encoding="utf-8") as blocks:
+            for line in blocks:
+                line = line.split("#")[0].strip()
+                if not line:
+                    continue
+                span, name = line.split(";")
+                start, end = span.split("..")
+                self._starts.append(int(start, 16))
+                self._ends.append(int(end, 16))
+                self._names.append(name.strip())
+
+    def __len__(self):
+        return len(self._starts)
+
+    def blocks(self):
+        return zip(self._starts, self._ends, self._names)
+
+    def block(self, code_point: int) -> str:
+        index = bisect_right(self._starts, code_point) - 1
+        if index >= 0 and code_point <= self._ends[index]:
+            return self._names[index]
+        return "No Block"
+
+    def block_range(self, name: str):
+        # Block names are compared loosely as recommended by the unicode standard
+        key = name.lower().replace(" ", "").replace("-", "").replace("_", "")
+        for start, end, block in self.blocks():
+            if block.lower().replace(" ", "").replace("-", "").replace("_", "") == key:
+                return start, end
+        return None
+
+    def names(self):
+        for code_point in range(codespace.MAX_CODE_POINT + 1):
+            name = unicodedata.name(chr(code_point), None)
+            if name is not None:
+                yield code_point, name
+
+    def lookup(self, code_point: int) -> CharacterInfo:
+        char = chr(code_point)
+        return CharacterInfo(
+            code_point,
+            unicodedata.name(char, None),
+            self.block(code_point),
+            codespace.plane_name(code_point),
+            CATEGORIES[unicodedata.category(char)],
+            surrogate_pair(code_point)
+        )
+
+
+DATABASE_VERSION = 1
+DATABASE_MAGIC = b"UVMD"
+# magic, version, unicode version, records offset, block table offset, category table offset
+_DATABASE_HEADER = struct.Struct("<4sH16sIII")
+# name offset, name length, category, block (0xffff for none)
+_RECORD = struct.Struct("<IBBH")
+# string offset, string length
+_STRING = struct.Struct("<IB")
+_NO_BLOCK = 0xffff
+
+
+def database_path() -> str:
+    # The block names stored in the database depend on both unicode versions
+    return cache_path("metadata-{}-blocks-{}.bin".format(unicodedata.unidata_version, blocks_version()))
+
+
+def build_database(path: str, index: UnicodeIndex = None) -> None:
+    """
+    Write the metadata of all code points as fixed width records followed by a string table.
+    The file is written under a temporary name and renamed so readers never see it half written.
+    """
+    index = index or UnicodeIndex()
+    count = codespace.MAX_CODE_POINT + 1
+    categories = list(CATEGORIES)
+    category_ids = {code: i for i, code in enumerate(categories)}
+    blocks = [name for _, _, name in index.blocks()]
+    strings = bytearray()
+
+    def intern(text: str):
+        data = text.encode("ascii")
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    records = bytearray(count * _RECORD.size)
+    block_of = bytearray(b"\xff\xff") * count
+    for i, (start, end, _) in enumerate(index.blocks()):
+        block_of[start * 2: (end + 1) * 2] = struct.pack("<H", i) * (end - start + 1)
+    for code_point in range(count):
+        char = chr(code_point)
+        name = unicodedata.name(char, None)
+        offset, length = intern(name) if name else (0, 0)
+        block, = struct.unpack_from("<H", block_of, code_point * 2)
+        _RECORD.pack_into(records, code_point * _RECORD.size, offset, length,
+                          category_ids[unicodedata.category(char)], block)
+    block_table = b"".join(_STRING.pack(*intern(name)) for name in blocks)
+    category_table = b"".join(_STRING.pack(*intern(code)) for code in categories)
+
+    records_offset = _DATABASE_HEADER.size
+    blocks_offset = records_offset + len(records)
+    categories_offset = blocks_offset + len(block_table)
+    header = _DATABASE_HEADER.pack(DATABASE_MAGIC, DATABASE_VERSION, unicodedata.unidata_version.encode("ascii"),
+                                   records_offset, blocks_offset, categories_offset)
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            for part in (header, records, block_table, category_table, strings):
+                file.write(part)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+class MetadataDatabase:
+    """
+    Read only view of a database written by build_database
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, unidata, self._records, blocks, categories = _DATABASE_HEADER.unpack_from(self._map)
+        except struct.error:
+            self.close()
+            raise ValueError("Not a metadata database")
+        if magic != DATABASE_MAGIC or version != DATABASE_VERSION:
+            self.close()
+            raise ValueError("Not a metadata database")
+        if unidata.rstrip(b"\0").decode("ascii") != unicodedata.unidata_version:
+            self.close()
+            raise ValueError("Metadata database built from another unicode version")
+        # The tables are small and referenced by every record so they are decoded up front
+        self._strings = categories + len(CATEGORIES) * _STRING.size
+        self._blocks = [self._string(*entry) for entry in _STRING.iter_unpack(self._map[blocks: categories])]
+        self._categories = [CATEGORIES[self._string(*entry)]
+                            for entry in _STRING.iter_unpack(self._map[categories: self._strings])]
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return self._map[start: start + length].decode("ascii")
+
+    def _record(self, code_point: int):
+        return _RECORD.unpack_from(self._map, self._records + code_point * _RECORD.size)
+
+    def name(self, code_point: int):
+        offset, length, _, _ = self._record(code_point)
+        return self._string(offset, length) if length else None
+
+    def names(self):
+        """
+        Generate (code point, name) of every named code point
+        """
+        records = memoryview(self._map)[self._records: self._records + (codespace.MAX_CODE_POINT + 1) * _RECORD.size]
+        try:
+            for code_point, (offset, length, _, _) in enumerate(_RECORD.iter_unpack(records)):
+                if length:
+                    yield code_point, self._string(offset, length)
+        finally:
+            records.release()
+
+    def lookup(self, code_point: int) -> CharacterInfo:
+        offset, length, category, block = self._record(code_point)
+        return CharacterInfo(
+            code_point,
+            self._string(offset, length) if length else None,
+            self._blocks[block] if block != _NO_BLOCK else "No Block",
+            codespace.plane_name(code_point),
+            self._categories[category],
+            surrogate_pair(code_point)
+        )
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def open_database(path: str = None):
+    """
+    Open the metadata database generating it first if necessary
+    :return: the database or None if it cannot be written in which case unicodedata is used directly
+    """
+    path = path or database_path()
+    try:
+        return MetadataDatabase(path)
+    except (OSError, ValueError):
+        pass
+    try:
+        build_database(path, get_index())
+        return MetadataDatabase(path)
+    except (OSError, ValueError):
+        return None
+
+
+_index = None
+_database = None
+
+
+def describe(code_point: int, font: str = None) -> dict:
+    """
+    Human readable metadata of a code point as displayed by the info dialog
+    :param code_point:
+    :param font: font family included in the description when given
+    :return:
+    """
+    info = lookup(code_point)
+    pair = " ".join("{:x}".format(unit) for unit in info.surrogate_pair) if info.surrogate_pair else "None"
+    data = {"Font family": font} if font is not None else {}
+    data.update({
+        "Name": info.name or "None",
+        "Code point": str(info.code_point),
+        "Hexadecimal scalar": "{:x}".format(info.code_point),
+        "Surrogate pair": pair,
+        "Plane": info.plane,
+        "Block": info.block,
+        "Category": info.category
+    })
+    return data
+
+
+def record(code_point: int, font: str = None) -> dict:
+    """
+    Machine readable metadata of a code point with the keys of describe. Numbers are integers and
+    missing values are None instead of display strings.
+    """
+    info = lookup(code_point)
+    data = {"Font family": font} if font is not None else {}
+    data.update({
+        "Name": info.name,
+        "Code point": info.code_point,
+        "Hexadecimal scalar": "{:x}".format(info.code_point),
+        "Surrogate pair": list(info.surrogate_pair) if info.surrogate_pair else None,
+        "Plane": info.plane,
+        "Block": info.block if info.block != "No Block" else None,
+        "Category": info.category
+    })
+    return data
+
+
+def get_index() -> UnicodeIndex:
+    # The index is built once and shared by everything that needs metadata
+    global _index
+    if _index is None:
+        _index = UnicodeIndex()
+    return _index
+
+
+def get_database():
+    # Falls back to the index when the database cannot be written, both answer the same queries
+    global _database
+    if _database is None:
+        _database = open_database() or get_index()
+    return _database
+
+
+def lookup(code_point: int) -> CharacterInfo:
+    return get_database().lookup(code_point)
@@ -0,0 +1,216 @@
+"""
+Search for characters by name. Names are split into words and an inverted index maps every word to
+the sorted code points whose name contains it. The index is built once from the metadata database
+and stored compressed in the cache directory so later runs only have to load it.
+"""
+from bisect import bisect_left
+from array import array
+from cache import cache_path
+import unicodedata
+import metadata
+import struct
+import zlib
+import sys
+import re
+
+FORMAT_VERSION = 1
+MAGIC = b"UVNI"
+_HEADER = struct.Struct("<4sHH16s")
+_SPLIT = re.compile(r"[ \-]+")
+# Query words shorter than this are only matched as prefixes of name words
+MIN_SUBSTRING = 3
+# Words matching up to this many tokens are tested by bisecting their postings instead of building a set
+MAX_BISECTED = 4
+
+
+def index_path() -> str:
+    return cache_path("names-{}.bin".format(unicodedata.unidata_version))
+
+
+def tokenize(text: str) -> list:
+    return [token for token in _SPLIT.split(text.upper()) if token]
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _contains(postings, code_point: int) -> bool:
+    if isinstance(postings, set):
+        return code_point in postings
+    for run in postings:
+        index = bisect_left(run, code_point)
+        if index < len(run) and run[index] == code_point:
+            return True
+    return False
+
+
+class NameIndex:
+
+    def __init__(self, tokens: list, offsets: array, postings: array):
+        """
+        :param tokens: sorted words found in character names
+        :param offsets: start of the postings of tokens[i] is offsets[i] and its end offsets[i + 1]
+        :param postings: code points of every token one after another, each run sorted
+        """
+        self.tokens = tokens
+        self.offsets = offsets
+        self.postings = postings
+        # All tokens in a single string so substrings are located by str.find instead of a python loop
+        self._joined = "\n".join(tokens) + "\n"
+        self._starts = array("I")
+        position = 0
+        for token in tokens:
+            self._starts.append(position)
+            position += len(token) + 1
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @classmethod
+    def build(cls):
+        words = {}
+        for code_point, name in metadata.get_database().names():
+            for token in set(tokenize(name)):
+                words.setdefault(token, array("I")).append(code_point)
+        tokens = sorted(words)
+        offsets, postings = array("I", [0]), array("I")
+        for token in tokens:
+            postings.extend(words[token])
+            offsets.append(len(postings))
+        return cls(tokens, offsets, postings)
+
+    def dumps(self) -> bytes:
+        tokens = "\n".join(self.tokens).encode("utf-8")
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, unicodedata.unidata_version.encode("ascii"))
+        body = struct.pack("<III", len(tokens), len(self.offsets), len(self.postings))
+        return header + zlib.compress(body + tokens + _pack(self.offsets) + _pack(self.postings))
+
+    @classmethod
+    def loads(cls, data: bytes):
+        magic, version, _, unidata = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a name index")
+        if unidata.rstrip(b"\0").decode("ascii") != unicodedata.unidata_version:
+            raise ValueError("Name index built from another unicode version")
+        data = zlib.decompress(data[_HEADER.size:])
+        tokens_size, offsets_count, postings_count = struct.unpack_from("<III", data)
+        position = 12
+        tokens = data[position: position + tokens_size].decode("utf-8").split("\n")
+        position += tokens_size
+        offsets = _unpack(data[position: position + offsets_count * 4])
+        position += offsets_count * 4
+        postings = _unpack(data[position: position + postings_count * 4])
+        return cls(tokens, offsets, postings)
+
+    @classmethod
+    def load(cls, path: str = None):
+        """
+        Load the index from the cache directory building and storing it first if necessary
+        """
+        path = path or index_path()
+        try:
+            with open(path, "rb") as file:
+                return cls.loads(file.read())
+        except (OSError, ValueError, zlib.error, struct.error):
+            pass
+        index = cls.build()
+        try:
+            with open(path, "wb") as file:
+                file.write(index.dumps())
+        except OSError:
+            pass
+        return index
+
+    def _postings(self, index: int):
+        return self.postings[self.offsets[index]: self.offsets[index + 1]]
+
+    def matching_tokens(self, word: str) -> list:
+        """
+        Indices of the tokens word is a prefix of or, for long enough words, a substring of
+        """
+        start = bisect_left(self.tokens, word)
+        end = start
+        while end < len(self.tokens) and self.tokens[end].startswith(word):
+            end += 1
+        matches = list(range(start, end))
+        if len(word) >= MIN_SUBSTRING:
+            position = self._joined.find(word)
+            while position != -1:
+                index = bisect_left(self._starts, position + 1) - 1
+                if position != self._starts[index]:
+                    matches.append(index)
+                # Jump to the next token since one occurrence is enough
+                position = self._joined.find(word, self._starts[index] + len(self.tokens[index]) + 1)
+        return matches
+
+    def search(self, query: str):
+        """
+        Generate the code points whose name matches every word of query in ascending order
+        """
+        words = tokenize(query)
+        if not words:
+            return
+        groups = []
+        for word in words:
+            postings = [self._postings(index) for index in self.matching_tokens(word)]
+            if not postings:
+                return
+            groups.append(postings)
+        groups.sort(key=lambda group: sum(map(len, group)))
+        # Candidates come from the rarest word and are checked against the others
+        candidates = sorted(set().union(*groups[0])) if len(groups[0]) > 1 else groups[0][0]
+        others = [group if len(group) <= MAX_BISECTED else set().union(*group) for group in groups[1:]]
+        for code_point in candidates:
+            if all(_contains(other, code_point) for other in others):
+                yield code_point
+
+
+class SearchCursor:
+    """
+    Lazily consumed search results. Results are only computed as far as the pages asked for.
+    """
+
+    def __init__(self, results):
+        self._results = iter(results)
+        self.fetched = []
+        self.exhausted = False
+
+    def slice(self, start: int, count: int) -> list:
+        while len(self.fetched) < start + count and not self.exhausted:
+            try:
+                self.fetched.append(next(self._results))
+            except StopIteration:
+                self.exhausted = True
+        return self.fetched[start: start + count]
+
+    def cancel(self) -> None:
+        # Drop the remaining results, the generator is closed so it stops holding on to its candidates
+        if hasattr(self._results, "close"):
+            self._results.close()
+        self.exhausted = True
+
+
+_index = None
+
+
+def get_index() -> NameIndex:
+    global _index
+    if _index is None:
+        _index = NameIndex.load()
+    return _index
+
+
+def search(query: str):
+    return get_index().search(query)
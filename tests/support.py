@@ -12,21 +12,23 @@ class MockEvent:
 class MockApp(App):
     """
     Subclass of App that is optimized for testing purposes.
-    It prevents Thread functionality which tends to break tkinter tests
-    by overriding methods that spawn threads and coercing them to run within
-    the main thread.
+    There is no mainloop during tests so queued renders would never run.
+    Rendering is therefore overridden to run synchronously.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         # Remove components
         list(map(lambda component: component.uninstall(), self.components))
+        # Hover broadcasts wait for the next frame which needs a mainloop so broadcast immediately
+        self.hover.frame_ms = 0
         # Hide window
         self.withdraw()
 
-    def render(self, from_: int) -> None:
-        # We need to prevent thread functionality during tests
-        self._render(from_, None)
+    def render(self, from_: int, code_points: list = None, results=None) -> None:
+        # Queued renders need a mainloop so render immediately during tests
+        self.use_results(results)
+        self._render(from_, code_points)
 
     @property
     def flattened_grids(self):
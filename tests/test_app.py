@@ -1,7 +1,13 @@
 from tests.support import MockApp
-from app import MAX_GRID_HEIGHT, MAX_GRID_WIDTH, App
+from app import MAX_GRID_HEIGHT, MAX_GRID_WIDTH, App, RenderScheduler, HoverThrottle
 import unittest
+import subprocess
+import sys
+import os
 import components
+import codespace
+from coverage import Coverage
+from events import Event
 
 MAX_GRID_SIZE = MAX_GRID_HEIGHT*MAX_GRID_WIDTH
 # For testing purposes ensure these conditions are met
@@ -50,14 +56,186 @@ class AppGridHandlingTestCase(unittest.TestCase):
             with self.subTest(grid=grid):
                 self.assertNotEqual(grid.text, "", "Incomplete rendering")
         self.assertFalse(sample_grid.is_locked, "Locked not removed by rendering as expected")
-        self.app.render(65475)
-        # This causes a fracture at 60 grids because then the range is beyond 0xffff
+        self.assertEqual(self.app.current_range, [65455, 65455 + 80], "Rendering stopped at the BMP boundary")
+        self.app.render(codespace.MAX_CODE_POINT - 59)
+        # This causes a fracture at 60 grids because then the range is beyond 0x10ffff
         for grid in self.app.grid_cluster[60:]:
             with self.subTest(grid=grid):
                 self.assertEqual(grid.text, "", "Fracture failed. Illegal grid rendering")
         self.app.grid_cluster[0].lock()
-        self.app.render(0xffff + 10)
-        self.assertTrue(sample_grid.is_locked, "Illegal rendering of a range beyond limit")
+        self.app.render(codespace.MAX_CODE_POINT + 10)
+        self.assertTrue(self.app.grid_cluster[0].is_locked, "Illegal rendering of a range beyond limit")
+
+    def test_surrogate_skipping(self):
+        self.app.size = (10, 8)
+        self.app.render(0xd800 - 40)
+        self.assertEqual(self.app.grid_cluster[40].text, hex(0xe000), "Surrogates not skipped")
+        self.assertEqual(self.app.current_range, [0xd800 - 40, 0xe000 + 40], "Wrong range after skipping")
+
+    def test_diff_repaint(self):
+        self.app.size = (10, 8)
+        self.app.render(40000)
+        self.app.repaint_stats.reset()
+        self.app.render(40000)
+        self.assertEqual(self.app.repaint_stats.issued, 0, "Unchanged page should not be repainted")
+        self.app.render(40010)
+        # Every grid shifts by 10 code points so all of them must be repainted
+        self.assertEqual(self.app.repaint_stats.issued, 80, "Changed grids not repainted")
+        self.app.size = (6, 6)
+        hidden = [grid for grid in self.app.flattened_grids if grid not in self.app.grid_cluster]
+        for grid in hidden:
+            with self.subTest(grid=self.app.flattened_grids.index(grid)):
+                self.assertEqual(grid.text, "", "Hidden grids not cleared")
+
+    def test_coverage_dimming(self):
+        bitmap = Coverage()
+        bitmap.add_range(40000, 40009)
+        self.app.size = (10, 8)
+        self.app.render(40000)
+        self.app.set_coverage(bitmap)
+        supported, unsupported = self.app.grid_cluster[0], self.app.grid_cluster[10]
+        self.assertEqual(supported['fg'], supported.default_fg, "Supported character dimmed")
+        self.assertEqual(unsupported['fg'], "#d0d0d0", "Unsupported character not dimmed")
+        self.app.set_coverage(None)
+        self.assertEqual(unsupported['fg'], unsupported.default_fg, "Dimming not removed")
+
+
+class CanvasBackendTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp(backend="canvas", max_size=(100, 50))
+        self.canvas = self.app.grid_canvas
+        self.canvas.layout(1000, 500)
+
+    def tearDown(self) -> None:
+        self.app.destroy()
+
+    def test_init_grids(self):
+        self.assertEqual(len(self.app.body.winfo_children()), 1, "Canvas backend created grid widgets")
+        self.assertEqual(len(self.app.grids), 100, "Wrong column arrangement")
+        self.assertEqual(len(self.app.grids[0]), 50, "Wrong row arrangement")
+
+    def test_large_size(self):
+        self.app.size = (100, 50)
+        self.app.render(0x4e00)
+        self.assertEqual(len(self.app.grid_cluster), 5000, "Incorrect size")
+        self.assertEqual(self.app.current_range, [0x4e00, 0x4e00 + 5000], "Incorrect range rendered")
+        self.assertEqual(self.app.grid_cluster[-1]['text'], chr(0x4e00 + 4999), "Incorrect grid rendered")
+
+    def test_hit_testing(self):
+        self.app.size = (100, 50)
+        self.app.render(0x4e00)
+        self.assertIs(self.canvas.cell_at(15, 25), self.app.grids[1][2], "Incorrect hit testing")
+        self.assertIsNone(self.canvas.cell_at(1000, 25), "Hit outside the canvas")
+        cell = self.app.grids[1][2]
+        self.canvas.hover_at(15, 25)
+        self.assertEqual(cell['bg'], "#bbb", "Hovering failed")
+        self.canvas.hover_at(25, 25)
+        self.assertEqual(cell['bg'], "#f7f7f7", "Could not exit hovering")
+        cell.lock()
+        self.assertIs(self.app.active_grid, cell, "Lock failed")
+
+    def test_grid_api(self):
+        self.app.size = (10, 5)
+        self.app.render(45000)
+        grid = self.app.grid_cluster[0]
+        self.assertEqual(grid.code_point, 45000, "Incorrect code point")
+        self.assertEqual(grid.font, self.app.grid_font.cget("family"), "Shared font not used")
+        self.assertEqual(grid.data["Hexadecimal scalar"], "afc8", "Incorrect data")
+        grid.copy(0)
+        self.assertEqual(grid.clipboard_get(), chr(45000), "Failed to copy unicode")
+        self.assertEqual(self.canvas.itemcget(grid.label, "text"), chr(45000), "Canvas text not painted")
+
+
+class RenderSchedulerTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp()
+        self.scheduler = RenderScheduler(self.app)
+
+    def tearDown(self) -> None:
+        self.app.destroy()
+
+    def test_coalescing(self):
+        for from_ in range(1000, 1010):
+            self.scheduler.request(from_)
+        self.assertTrue(self.scheduler.busy, "Render not queued")
+        self.assertEqual(self.app._from, 59422, "Render ran before reaching the mainloop")
+        self.app.update_idletasks()
+        self.assertFalse(self.scheduler.busy, "Queued render not flushed")
+        self.assertEqual(self.app._from, 1009, "Latest request not rendered")
+        self.assertEqual(self.scheduler.rendered, 1, "Requests not coalesced")
+        self.assertEqual(self.scheduler.coalesced, 9, "Wrong coalesced count")
+
+    def test_cancel(self):
+        self.scheduler.request(1000)
+        self.scheduler.cancel()
+        self.app.update_idletasks()
+        self.assertEqual(self.scheduler.rendered, 0, "Cancelled render still ran")
+
+    def test_out_of_range_request(self):
+        self.scheduler.request(codespace.MAX_CODE_POINT + 10)
+        self.app.update_idletasks()
+        self.assertEqual(self.scheduler.latest, self.app._from, "Scheduler out of sync with displayed range")
+
+
+class HoverThrottleTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp()
+        self.tracker = components.GridTracker(self.app)
+        self.app.components.append(self.tracker)
+        self.throttle = self.app.hover = HoverThrottle(self.app, frame_ms=1000)
+
+    def tearDown(self) -> None:
+        self.app.destroy()
+
+    def test_coalescing(self):
+        first, second, third = self.app.grid_cluster[:3]
+        first.hover(True)
+        self.assertEqual(self.tracker.text, first.text, "First hover of a frame not broadcast immediately")
+        second.hover(True)
+        third.hover(True)
+        self.assertEqual(self.tracker.text, first.text, "Broadcast more than once per frame")
+        self.throttle.flush()
+        self.assertEqual(self.tracker.text, third.text, "Latest hover not broadcast")
+        self.assertEqual(self.throttle.broadcast, 2)
+
+    def test_repeated_broadcast_skipped(self):
+        grid = self.app.grid_cluster[0]
+        grid.hover(True)
+        grid.hover(True)
+        self.throttle.flush()
+        self.assertEqual(self.throttle.broadcast, 1, "Unchanged hover broadcast again")
+        grid.set(0x41)
+        grid.hover(True)
+        self.throttle.flush()
+        self.assertEqual(self.throttle.broadcast, 2, "Changed code point not broadcast")
+
+    def test_subscriptions(self):
+        self.assertEqual(self.app.bus.subscribers(Event.GRID), [self.tracker.receive_grid])
+        self.assertEqual(self.app.bus.subscribers(Event.RANGE), [])
+
+
+class StartupTestCase(unittest.TestCase):
+
+    def test_heavy_modules_not_imported(self):
+        code = "import sys, app; print(sorted({'PIL', 'dialogs', 'glyphs', 'export'} & set(sys.modules)))"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]", "Modules needed only by dialogs imported at startup")
+
+    def test_glyph_cache_created_lazily(self):
+        app = MockApp()
+        self.assertIsNone(app._glyph_cache)
+        self.assertIs(app.glyph_cache, app.glyph_cache, "Glyph cache not shared")
+        app.destroy()
+
+    def test_startup_timings(self):
+        app = MockApp()
+        for phase in ("grids", "components", "total"):
+            self.assertIn(phase, app.startup_timings, "Startup phase not timed")
+        app.destroy()
 
 
 class AppFavouritesHandlingTestCase(unittest.TestCase):
@@ -69,10 +247,10 @@ class AppFavouritesHandlingTestCase(unittest.TestCase):
     def tearDown(self) -> None:
         self.app.set_favourites(self.prev_fav)
 
-    def test_key_safety(self):
+    def test_remove_favourites(self):
+        self.app.set_favourites([(45000, "Arial")])
         self.app.remove_favourites()
-        with self.app.get_favourites() as data:
-            self.assertIn("favourites", data, "Key safety failed")
+        self.assertEqual(self.app.favourites_as_list(), [], "Favourites not removed")
 
     def test_set_favourites(self):
         self.app.set_favourites([(45000, "Arial")])
@@ -0,0 +1,26 @@
+import unittest
+from benchmarks.suite import compare
+
+
+def medians(**values):
+    return {name: {"median_ms": value, "min_ms": value} for name, value in values.items()}
+
+
+class CompareTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.baseline = medians(render=10.0, hover=2.0)
+
+    def test_within_tolerance(self):
+        self.assertEqual(compare(medians(render=12.0, hover=1.0), self.baseline, 0.25), [])
+
+    def test_regression(self):
+        self.assertEqual(compare(medians(render=13.0, hover=2.0), self.baseline, 0.25), [("render", 10.0, 13.0)])
+
+    def test_missing_from_baseline(self):
+        self.assertEqual(compare(medians(render=10.0, search=500.0), self.baseline), [],
+                         "Benchmark without a baseline reported as a regression")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import subprocess
+import tempfile
+import argparse
+import json
+import sys
+import io
+import os
+import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CliTestCase(unittest.TestCase):
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        cli.run(cli.build_parser().parse_args(argv), out)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_parse_code_point(self):
+        self.assertEqual(cli.parse_code_point("U+1F600"), 0x1f600)
+        self.assertEqual(cli.parse_code_point("0x41"), 0x41)
+        self.assertEqual(cli.parse_code_point("ff"), 0xff)
+        self.assertEqual(cli.parse_code_point("@"), 0x40)
+        self.assertEqual(cli.parse_code_point("é"), 0xe9)
+        self.assertEqual(cli.parse_code_point("你"), 0x4f60)
+        self.assertEqual(cli.parse_code_point("A"), 0xa, "Hexadecimal digit read as a character")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            cli.parse_code_point("110000")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            cli.parse_code_point("xyz")
+
+    def test_info(self):
+        record, = self.run_cli("info", "1f600", "--font", "Arial")
+        self.assertEqual(record["Name"], "GRINNING FACE")
+        self.assertEqual(record["Font family"], "Arial")
+        self.assertEqual(record["Surrogate pair"], [0xd83d, 0xde00])
+        self.assertEqual(record["Code point"], 0x1f600)
+
+    def test_missing_values_are_null(self):
+        record, = self.run_cli("info", "e000")
+        self.assertIsNone(record["Name"], "Unnamed code point not null")
+        self.assertIsNone(record["Surrogate pair"], "Surrogate pair of a BMP character not null")
+
+    def test_range_skips_surrogates(self):
+        records = self.run_cli("range", "d7fe", "--count", "3")
+        self.assertEqual([record["Hexadecimal scalar"] for record in records], ["d7fe", "d7ff", "e000"])
+
+    def test_range_font(self):
+        record, = self.run_cli("range", "41", "--count", "1", "--font", "Arial")
+        self.assertEqual(record["Font family"], "Arial")
+
+    def test_favourites_read_only(self):
+        with tempfile.TemporaryDirectory() as directory:
+            code = "import sys; sys.path.insert(0, {!r}); import cli; cli.main(['favourites'])".format(ROOT)
+            result = subprocess.run([sys.executable, "-c", code], cwd=directory, capture_output=True, text=True,
+                                    check=True)
+            self.assertEqual(result.stdout, "")
+            self.assertEqual(os.listdir(directory), [], "Listing favourites created a database")
+
+    def test_range_is_lazy(self):
+        records = cli.range_(0)
+        self.assertEqual(next(records)["Code point"], 0)
+
+    def test_search(self):
+        records = self.run_cli("search", "latin capital letter a with", "--limit", "2")
+        self.assertEqual(len(records), 2)
+        for record in records:
+            self.assertIn("LATIN CAPITAL LETTER A WITH", record["Name"])
+
+    def test_no_tkinter(self):
+        code = "import sys, cli; cli.main(['range', '0', '--count', '1']); print('tkinter' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.splitlines()[-1], "False", "tkinter imported by the command line")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import unicodedata
+import codespace
+
+
+class CodeSpaceTestCase(unittest.TestCase):
+
+    def test_skipped_ranges_unassigned(self):
+        # Only surrogates and unassigned code points may be skipped
+        for start, end in codespace.SKIPPED_RANGES:
+            for code_point in range(start, end + 1, 97):
+                with self.subTest(code_point=hex(code_point)):
+                    self.assertIn(unicodedata.category(chr(code_point)), ("Cs", "Cn"), "Assigned code point skipped")
+
+    def test_page(self):
+        self.assertEqual(codespace.page(0, 5), [0, 1, 2, 3, 4], "Incorrect page")
+        page = codespace.page(0xd800 - 2, 4)
+        self.assertEqual(page, [0xd7fe, 0xd7ff, 0xe000, 0xe001], "Surrogates not skipped")
+        self.assertEqual(codespace.page(0xd900, 1), [0xe000], "Page starting in skipped range")
+        self.assertEqual(codespace.page(codespace.MAX_CODE_POINT - 1, 10), [0x10fffe, 0x10ffff], "Fracture failed")
+        self.assertEqual(codespace.page(codespace.MAX_CODE_POINT + 1, 10), [], "Page beyond code space")
+
+    def test_page_start_before(self):
+        self.assertEqual(codespace.page_start_before(100, 20), 80, "Incorrect previous page")
+        self.assertEqual(codespace.page_start_before(10, 20), 0, "Previous page below zero")
+        self.assertEqual(codespace.page_start_before(0xe002, 4), 0xd7fe, "Surrogates not skipped")
+        self.assertEqual(codespace.page_start_before(0xe0000, 1), 0x3ffff, "Unassigned planes not skipped")
+
+    def test_round_trip(self):
+        for start in (0, 0xd700, 0x2fa00, 0x3ff90, 0xe0050, 0xe01a0):
+            with self.subTest(start=hex(start)):
+                page = codespace.page(start, 200)
+                self.assertEqual(codespace.page_start_before(page[-1] + 1, 200), start, "Paging not reversible")
+
+    def test_plane_name(self):
+        self.assertEqual(codespace.plane_name(0x41), "Basic Multilingual")
+        self.assertEqual(codespace.plane_name(0x20000), "Supplementary Ideographic")
+        self.assertEqual(codespace.plane_name(0x10ffff), "Supplementary Private Use Area-B")
+
+
+class RowRingTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ring = codespace.RowRing(10, 5)
+
+    def test_reset(self):
+        self.ring.reset(0xd800 - 30)
+        self.assertEqual(self.ring.visible(), codespace.page(0xd800 - 30, 50), "Incorrect visible rows")
+
+    def test_scroll(self):
+        self.ring.reset(1000)
+        self.assertTrue(self.ring.scroll(2))
+        self.assertEqual(self.ring.start, 1020)
+        self.assertTrue(self.ring.scroll(-4))
+        self.assertEqual(self.ring.start, 980)
+        self.assertEqual(len(self.ring.rows), 5, "Rows kept beyond the viewport")
+
+    def test_bounds(self):
+        self.ring.reset(5)
+        self.ring.scroll(-3)
+        self.assertEqual(self.ring.start, 0, "Scrolled beyond the start of the code space")
+        self.assertEqual(self.ring.visible()[:6], [0, 1, 2, 3, 4, 5], "Rows overlap near the start")
+        self.assertFalse(self.ring.scroll(-1))
+        self.ring.reset(codespace.MAX_CODE_POINT - 25)
+        self.ring.scroll(10)
+        self.assertFalse(self.ring.scroll(1), "Scrolled beyond the end of the code space")
+
+
+if __name__ == '__main__':
+    unittest.main()
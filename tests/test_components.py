@@ -1,5 +1,6 @@
 import unittest
 from tests.support import MockApp
+from tracing import tracer
 import components
 import random
 
@@ -22,9 +23,11 @@ class InputBoxTestCase(unittest.TestCase):
         # Test data in the form (input_value, expected_value)
         test_data = (
             ("2345", 2345),
-            ("234555", 2345),
+            ("234555", 234555),
+            ("2345555", 234555),
             ("ffff", int("ffff", 16)),
-            ("fffff", int("ffff", 16)),
+            ("10ffff", int("10ffff", 16)),
+            ("1fffff", int("10ffff", 16)),
             ("50000", 50000)
         )
         for datum in test_data:
@@ -71,6 +74,151 @@ class SwipeTestCase(unittest.TestCase):
         self.component.prev_render()
         self.assertEqual(self.component.range[0], 40000 - 15 * 8, "Failed to render previous batch at different size")
 
+    def test_swipe_across_skipped_range(self):
+        self.app.size = (10, 8)
+        self.app.render(0xd800 - 40)
+        self.component.next_render()
+        self.assertEqual(self.component.range[0], 0xe000 + 40, "Failed to skip surrogates on next")
+        self.component.prev_render()
+        self.assertEqual(self.component.range[0], 0xd800 - 40, "Failed to skip surrogates on prev")
+        self.app.render(0x3ffff - 39)
+        self.component.next_render()
+        self.assertEqual(self.component.range[0], 0xe0000 + 40, "Failed to skip unassigned planes")
+
+
+class ScrollerTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp()
+        self.component = components.Scroller(self.app)
+        self.app.components.append(self.component)
+        self.app.size = (10, 8)
+        self.app.render(40000)
+
+    def test_scroll_columns(self):
+        # Grids are filled column by column so a step is one column of 8 code points
+        self.component.scroll(1)
+        self.assertEqual(self.app.current_range, [40008, 40088], "Failed to scroll a column forward")
+        self.component.scroll(-3)
+        self.assertEqual(self.app.current_range[0], 39984, "Failed to scroll columns back")
+        self.assertEqual(self.app.grid_cluster[0].text, hex(39984), "Scrolled page not rendered")
+        self.assertEqual(self.app.grid_cluster[8].text, hex(39992), "Scrolled page not laid out by columns")
+
+    def test_scroll_across_skipped_range(self):
+        self.app.render(0xd800 - 8)
+        self.component.scroll(1)
+        self.assertEqual(self.app.current_range[0], 0xe000, "Surrogates not skipped while scrolling")
+        self.component.scroll(-1)
+        self.assertEqual(self.app.current_range[0], 0xd800 - 8, "Surrogates not skipped while scrolling back")
+
+    def test_scroll_page(self):
+        self.component.scroll(5)
+        self.assertEqual(self.app.current_range[0], 40040, "Failed to scroll several columns")
+        self.assertEqual(len(self.component.ring.rows), 10, "Columns kept beyond the viewport")
+
+    def test_size_change(self):
+        self.app.size = (10, 12)
+        self.component.scroll(1)
+        self.assertEqual(self.app.current_range[0], 40012, "Column height not updated on size change")
+
+    def test_bindings(self):
+        grid = self.app.grid_cluster[0]
+        self.assertIn(self.component.tag, grid.bindtags(), "Scrolling not bound on the grids")
+        self.assertIn(self.component.tag, self.app.body.bindtags(), "Scrolling not bound on the body")
+        self.assertNotIn('<Up>', self.app.bind(), "Scrolling bound on the whole window")
+        self.component.uninstall()
+        self.assertNotIn(self.component.tag, grid.bindtags(), "Bindings left after uninstall")
+
+
+class SearchControlTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp()
+        self.component = components.SearchControl(self.app)
+        self.swipe = components.Swipe(self.app)
+        self.app.components.extend([self.component, self.swipe])
+        self.component.start_loading()
+        self.component.loader.join()
+        self.app.size = (10, 5)
+
+    def tearDown(self) -> None:
+        self.app.destroy()
+
+    def displayed(self):
+        return [int(grid.text, 16) for grid in self.app.grid_cluster if grid.text]
+
+    def test_search(self):
+        self.component.input.insert(0, "grinning face")
+        self.component.search()
+        self.assertEqual(self.app.grid_cluster[0].text, hex(0x1f600), "Search results not rendered")
+
+    def test_results_computed_lazily(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        self.assertEqual(len(self.displayed()), 50, "Results not limited to a page")
+        self.assertEqual(len(self.app.results.fetched), 50, "Results computed beyond the displayed page")
+
+    def test_swipe_through_results(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        first = self.displayed()
+        self.swipe.next_render()
+        second = self.displayed()
+        self.assertEqual(self.app.results.fetched[50:100], second, "Next page of results not rendered")
+        self.assertGreater(second[0], first[-1])
+        self.swipe.prev_render()
+        self.assertEqual(self.displayed(), first, "Previous page of results not rendered")
+        self.swipe.prev_render()
+        self.assertEqual(self.displayed(), first, "Paged before the first result")
+
+    def test_last_page(self):
+        self.component.input.insert(0, "grinning face")
+        self.component.search()
+        self.swipe.next_render()
+        self.assertEqual(self.app.grid_cluster[0].text, hex(0x1f600), "Paged past the last result")
+
+    def test_query_change_cancels_search(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        previous = self.app.results
+        self.component.input.insert("end", " a")
+        self.assertIsNotNone(self.component._job, "Search not debounced")
+        self.component.search()
+        self.assertIsNot(self.app.results, previous)
+        self.assertTrue(previous.exhausted, "Previous search not cancelled")
+
+    def test_range_render_leaves_results(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        self.app.render(40000)
+        self.assertIsNone(self.app.results)
+        self.swipe.next_render()
+        self.assertEqual(self.app.current_range[0], 40050, "Swipe not back to code point paging")
+
+    def test_size_change(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        self.app.size = (10, 6)
+        self.assertEqual(len(self.displayed()), 60, "Results not re-rendered on size change")
+
+    def test_no_results(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        previous, page = self.app.results, self.app.current_range
+        self.component.input.delete(0, "end")
+        self.component.input.insert(0, "zzqqxx")
+        self.component.search()
+        self.assertEqual(self.app.current_range, page, "Page changed without results")
+        self.assertIsNone(self.app.results, "Results of the previous query kept")
+        self.assertTrue(previous.exhausted, "Previous search not cancelled")
+
+    def test_empty_query(self):
+        self.component.input.insert(0, "letter")
+        self.component.search()
+        self.component.input.delete(0, "end")
+        self.component.search()
+        self.assertIsNone(self.app.results, "Results kept after the query was cleared")
+
 
 class GridTrackerTestCase(unittest.TestCase):
 
@@ -144,17 +292,74 @@ class FontSelectorTestCase(unittest.TestCase):
 
     def test_font_change(self):
         self.component.input.set(self.font)
-        self.component.value_changed()  # We need to do this since there is no mainloop to handle changes
+        self.component.apply_font()  # We need to do this since there is no mainloop to handle changes
         self.assertEqual(self.component.input.get(), self.font, "Font combobox failed")
         for grid in self.app.grid_cluster:
             with self.subTest(grid=self.app.grid_cluster.index(grid)):
                 self.assertEqual(grid.font, self.font, "Could not change font uniformly")
 
+    def test_font_debouncing(self):
+        family = self.app.grid_font.cget("family")
+        for partial in ("C", "Co", "Cou", "Cour"):
+            self.component.input.set(partial)
+        self.assertEqual(self.app.grid_font.cget("family"), family, "Font changed before typing settled")
+        self.assertIsNotNone(self.component._job, "Font change not scheduled")
+        self.component.apply_font()
+        self.assertEqual(self.app.grid_font.cget("family"), "Cour", "Settled font not applied")
+        self.assertEqual(self.app.grid_family, "Cour", "Family of the shared font not followed")
+        self.assertIsNone(self.component._job, "Pending font change not cancelled")
+
+    def test_coverage_loaded_in_background(self):
+        self.component.input.set(self.font)
+        self.component.apply_font()
+        self.component.loader.join()
+        self.component.poll_coverage(self.font)
+        self.assertIs(self.app.coverage, self.app.coverage_cache.coverage(self.font), "Coverage not applied")
+
+    def test_superseded_coverage(self):
+        self.component.apply_font()
+        previous = self.component.loader
+        previous.join()
+        self.component.family = self.font
+        self.component.poll_coverage("Arial")
+        self.assertIsNot(self.component.loader, previous, "Coverage of the latest family not looked up")
+        self.component.loader.join()
+
     def test_font_filtering(self):
         fonts = self.component._get_fonts()
         self.assertIsInstance(fonts, list, "Could not fetch fonts")
         self.assertTrue(is_sorted(fonts), "Fonts not sorted")
 
+    def test_deferred_font_loading(self):
+        self.component.load_fonts()
+        self.assertEqual(list(self.component.input["values"]), self.component._get_fonts(), "Fonts not loaded")
+        self.assertIn("font list (enumerated)", self.app.startup_timings, "Font enumeration not timed")
+
+
+class PerformanceOverlayTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp()
+        self.component = components.PerformanceOverlay(self.app)
+        self.app.components.append(self.component)
+
+    def tearDown(self) -> None:
+        self.component.uninstall()
+        self.app.destroy()
+
+    def test_render_latency(self):
+        self.assertTrue(tracer.enabled, "Tracing not enabled by the overlay")
+        for from_ in range(0, 500, 50):
+            self.app.render(from_)
+        self.assertIsNotNone(tracer.percentile("render", 0.5), "Render not traced")
+        self.component.tick()
+        self.assertIn("render p50", self.component.info["text"])
+
+    def test_uninstall(self):
+        self.component.uninstall()
+        self.assertFalse(tracer.enabled, "Tracing left enabled")
+        self.app.components.append(self.component)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import tempfile
+import struct
+import json
+import os
+import coverage
+import fontlist
+
+
+def make_font(subtable: bytes, platform: int = 3, encoding: int = 1) -> bytes:
+    # Minimal sfnt containing only a cmap table with a single subtable
+    cmap = struct.pack(">HHHHL", 0, 1, platform, encoding, 12) + subtable
+    header = struct.pack(">LHHHH", 0x00010000, 1, 16, 0, 0)
+    record = struct.pack(">4sLLL", b"cmap", 0, 12 + 16, len(cmap))
+    return header + record + cmap
+
+
+def format_4(segments) -> bytes:
+    # segments as (start, end, delta) with the mandatory 0xffff terminator appended
+    segments = list(segments) + [(0xffff, 0xffff, 1)]
+    count = len(segments)
+    data = struct.pack(">{}H".format(count), *[end for _, end, _ in segments]) + b"\0\0"
+    data += struct.pack(">{}H".format(count), *[start for start, _, _ in segments])
+    data += struct.pack(">{}H".format(count), *[delta & 0xffff for _, _, delta in segments])
+    data += struct.pack(">{}H".format(count), *[0] * count)
+    return struct.pack(">7H", 4, 14 + len(data), 0, count * 2, 0, 0, 0) + data
+
+
+def format_12(groups) -> bytes:
+    data = b"".join(struct.pack(">3L", *group) for group in groups)
+    return struct.pack(">HHLLL", 12, 0, 16 + len(data), 0, len(groups)) + data
+
+
+class CoverageTestCase(unittest.TestCase):
+
+    def test_bitmap(self):
+        bitmap = coverage.Coverage()
+        bitmap.add(0x41)
+        bitmap.add_range(0x1f600, 0x1f64f)
+        self.assertIn(0x41, bitmap)
+        self.assertIn(0x1f620, bitmap)
+        self.assertNotIn(0x42, bitmap)
+        self.assertEqual(len(bitmap), 81)
+        self.assertEqual(coverage.Coverage.loads(bitmap.dumps()).bits, bitmap.bits, "Compression round trip failed")
+
+    def test_format_4(self):
+        font = make_font(format_4([(0x20, 0x7e, -29), (0x391, 0x3a9, 100)]))
+        bitmap = coverage.parse_cmap(font)
+        self.assertIn(0x41, bitmap)
+        self.assertIn(0x3a0, bitmap)
+        # 0x1d maps to glyph 0 (.notdef) and is not covered
+        self.assertNotIn(0x1d, bitmap)
+        self.assertNotIn(0xffff, bitmap)
+        self.assertEqual(len(bitmap), 0x7e - 0x20 + 1 + 0x3a9 - 0x391 + 1)
+
+    def test_format_12(self):
+        font = make_font(format_12([(0x41, 0x5a, 1), (0x1f600, 0x1f64f, 30)]), 3, 10)
+        bitmap = coverage.parse_cmap(font)
+        self.assertIn(0x1f600, bitmap)
+        self.assertNotIn(0x1f650, bitmap)
+        self.assertEqual(len(bitmap), 26 + 80)
+
+    def test_missing_cmap(self):
+        header = struct.pack(">LHHHH", 0x00010000, 0, 0, 0, 0)
+        self.assertEqual(len(coverage.parse_cmap(header)), 0)
+
+
+class CoverageCacheTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.scan_path = os.path.join(self.dir.name, "font-paths.json")
+        self.cache = coverage.CoverageCache(self.scan_path)
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_unknown_family(self):
+        self.cache._paths["Not a font"] = None
+        self.assertIsNone(self.cache.coverage("Not a font"))
+
+    def test_installed_font(self):
+        fonts = [os.path.join(root, file) for directory in coverage.font_directories()
+                 for root, _, files in os.walk(directory) for file in files
+                 if file.lower().endswith((".ttf", ".otf"))]
+        if not fonts:
+            self.skipTest("No fonts installed")
+        self.cache._paths["Sample"] = fonts[0]
+        bitmap = self.cache.coverage("Sample")
+        self.assertIs(self.cache.coverage("Sample"), bitmap, "Coverage not kept in memory")
+        self.assertGreater(len(bitmap), 0, "Font has no coverage")
+
+    def test_malformed_font(self):
+        path = os.path.join(self.dir.name, "truncated.ttf")
+        with open(path, "wb") as file:
+            file.write(b"ttcf\0\0")
+        self.cache._paths["Truncated"] = path
+        self.assertIsNone(self.cache.coverage("Truncated"), "Malformed font not ignored")
+
+    def test_scan_persisted(self):
+        scanned = self.cache._scan()
+        with open(self.scan_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["paths"], scanned, "Scanned fonts not stored")
+        with open(self.scan_path, "w", encoding="utf-8") as file:
+            json.dump({"signature": fontlist.directories_signature(), "paths": {"sample": "sample.ttf"}}, file)
+        self.assertEqual(coverage.CoverageCache(self.scan_path)._scan(), {"sample": "sample.ttf"},
+                         "Stored scan not reused")
+        with open(self.scan_path, "w", encoding="utf-8") as file:
+            json.dump({"signature": [["missing", 0]], "paths": {"sample": "sample.ttf"}}, file)
+        self.assertEqual(coverage.CoverageCache(self.scan_path)._scan(), scanned, "Outdated scan reused")
+
+
+if __name__ == '__main__':
+    unittest.main()
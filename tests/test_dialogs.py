@@ -3,6 +3,10 @@ import dialogs
 import unittest
 import components
 import random
+import tempfile
+import json
+import os
+from tests.test_glyphs import sample_font
 
 
 class AllDialogTestCase(unittest.TestCase):
@@ -16,6 +20,45 @@ class AllDialogTestCase(unittest.TestCase):
         self.assertIsInstance(dialog, dialogs.UnicodeInfo)
         self.assertEqual(dialog.data, self.app.active_grid.data, "Wrong grid loaded")
 
+    @unittest.skipIf(sample_font() is None, "No fonts installed")
+    def test_save_as_image(self):
+        self.app.glyph_cache.font_path = lambda family: sample_font()
+        self.app.grid_cluster[0].lock()
+        dialog = dialogs.SaveAsImage(self.app)
+        dialog.export_size.set(120)
+        dialog.render_image()
+        self.assertIsNotNone(dialog.image, "Image not rendered")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "glyph.png")
+            dialog.image.save(path, dpi=dialog.image.info["dpi"])
+            self.assertTrue(os.path.getsize(path), "Image not saved")
+
+    def test_export_sheet(self):
+        self.app.size = (10, 5)
+        self.app.render(0x41)
+        self.app.grid_cluster[0].lock()
+        dialog = dialogs.ExportSheet(self.app)
+        self.assertEqual(dialog.start.get(), 0x41, "Start of range not prefilled")
+        self.assertEqual(dialog.end.get(), 0x41 + 49, "End of range not prefilled")
+
+    @unittest.skipIf(dialogs.glyphs.Image is None or sample_font() is None, "Pillow or fonts not available")
+    def test_export_sheet_written(self):
+        self.app.render(0x41)
+        self.app.grid_cluster[0].lock()
+        dialog = dialogs.ExportSheet(self.app)
+        dialog.end.set("5a")
+        dialog.glyph_size.set(20)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sheet.png")
+            dialog.start_export(sample_font(), path)
+            dialog.worker.join()
+            self.assertIsNone(dialog.error, "Export failed")
+            with open(os.path.join(directory, "sheet.json")) as file:
+                index = json.load(file)
+            self.assertEqual(index["size"], 20, "Chosen glyph size not used")
+            self.assertEqual(len(index["glyphs"]), 26, "Range not exported")
+            self.assertTrue(os.path.getsize(path), "Sheet not written")
+
 
 class ManageFavouritesTestCase(unittest.TestCase):
 
@@ -79,5 +122,26 @@ class ManageFavouritesTestCase(unittest.TestCase):
         grid.lock()
         self.dialog.remove()
         self.assertIsNone(self.dialog.active_grid, "Failed to remove grid")
-        self.assertFalse(grid.winfo_ismapped(), "Failed to remove grid from user interface")
-        self.assertNotIn((45000, 'Arial'), self.app.favourites_as_list(), "Could not remove grid from shelve")
+        self.assertEqual(len(self.dialog.grids), 1, "Failed to remove grid from user interface")
+        self.assertEqual(grid.font, 'Arial black', "Grid not recycled for the next favourite")
+        self.assertNotIn((45000, 'Arial'), self.app.favourites_as_list(), "Could not remove grid from favourites store")
+
+    def test_virtualization(self):
+        self.app.set_favourites([(code_point, 'Arial') for code_point in range(1000, 6000)])
+        self.dialog.load_favourites()
+        holder = self.dialog.holder
+        self.assertEqual(len(holder.cells), holder.columns * holder.rows, "Widgets created beyond the viewport")
+        for sequence in ('<Shift-MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.assertIn(sequence, holder.cells[0].bind(), "Scrolling not bound on the cells")
+        holder.xview("moveto", 0.5)
+        first = holder.first_column * holder.rows
+        self.assertEqual(self.dialog.grids[0].code_point, self.dialog.favourites[first][0], "Scrolling failed")
+        holder.xview("scroll", 1, "pages")
+        self.assertEqual(holder.first_column * holder.rows, first + holder.columns * holder.rows, "Paging failed")
+        self.assertEqual(len(holder.cells), holder.columns * holder.rows, "Widgets not recycled on scroll")
+        grid = self.dialog.grids[0]
+        removed = (grid.code_point, grid.font)
+        grid.lock()
+        self.dialog.remove()
+        self.assertNotIn(removed, self.dialog.favourites, "Favourite not removed from view")
+        self.assertEqual(len(self.dialog.favourites), 4999)
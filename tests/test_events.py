@@ -0,0 +1,90 @@
+import unittest
+from events import EventBus, Event
+
+
+class IdleQueue:
+    # Stands in for the Tk main loop, idle callbacks run when run() is called
+
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after_idle(self, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.callbacks.pop(job, None)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+class Listener:
+
+    def __init__(self):
+        self.grids = []
+        self.ranges = 0
+
+    def receive_grid(self, grid):
+        self.grids.append(grid)
+
+    def receive_range(self):
+        self.ranges += 1
+
+
+class EventBusTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.loop = IdleQueue()
+        self.bus = EventBus(self.loop)
+        self.listener = Listener()
+
+    def test_only_subscribers_called(self):
+        self.bus.subscribe(Event.GRID, self.listener.receive_grid)
+        self.bus.publish(Event.GRID, "grid")
+        self.bus.publish(Event.RANGE)
+        self.assertEqual(self.listener.grids, ["grid"])
+        self.assertEqual(self.listener.ranges, 0, "Handler called for an event it did not subscribe to")
+
+    def test_unsubscribe_owner(self):
+        self.bus.subscribe(Event.GRID, self.listener.receive_grid)
+        self.bus.subscribe(Event.RANGE, self.listener.receive_range)
+        self.bus.unsubscribe_owner(self.listener)
+        self.bus.publish(Event.GRID, "grid")
+        self.bus.publish(Event.RANGE)
+        self.assertEqual(self.listener.grids, [])
+        self.assertEqual(self.listener.ranges, 0)
+
+    def test_deferred_delivery(self):
+        self.bus.subscribe(Event.GRID, self.listener.receive_grid, deferred=True)
+        for grid in ("a", "b", "c"):
+            self.bus.publish(Event.GRID, grid)
+        self.assertEqual(self.listener.grids, [], "Deferred handler called immediately")
+        self.loop.run()
+        self.assertEqual(self.listener.grids, ["c"], "Only the latest deferred call should be delivered")
+        self.loop.run()
+        self.assertEqual(self.listener.grids, ["c"])
+
+    def test_flush(self):
+        self.bus.subscribe(Event.GRID, self.listener.receive_grid, deferred=True)
+        self.bus.publish(Event.GRID, "a")
+        self.bus.flush()
+        self.assertEqual(self.listener.grids, ["a"])
+        self.loop.run()
+        self.assertEqual(self.listener.grids, ["a"], "Flushed handler delivered twice")
+
+    def test_handler_stats(self):
+        self.bus.subscribe(Event.RANGE, self.listener.receive_range)
+        for _ in range(3):
+            self.bus.publish(Event.RANGE)
+        stats = self.bus.stats["Listener.receive_range"]
+        self.assertEqual(stats.calls, 3)
+        self.assertGreaterEqual(stats.worst, stats.mean)
+
+
+if __name__ == '__main__':
+    unittest.main()
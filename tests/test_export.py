@@ -0,0 +1,40 @@
+import unittest
+import tempfile
+import json
+import os
+from tests.test_glyphs import sample_font
+import export
+import glyphs
+
+
+class CodePointsTestCase(unittest.TestCase):
+
+    def test_range(self):
+        self.assertEqual(list(export.code_points_in(0x41, 0x45)), [0x41, 0x42, 0x43, 0x44, 0x45])
+        self.assertEqual(list(export.code_points_in(0xd7fe, 0xe001)), [0xd7fe, 0xd7ff, 0xe000, 0xe001])
+        self.assertEqual(len(list(export.code_points_in(0, 0xffff))), 0x10000 - 0x800, "Surrogates not skipped")
+
+    def test_coverage_filter(self):
+        covered = {0x41, 0x43}
+        self.assertEqual(list(export.code_points_in(0x41, 0x45, covered)), [0x41, 0x43])
+
+
+@unittest.skipIf(glyphs.Image is None or sample_font() is None, "Pillow or fonts not available")
+class AtlasTestCase(unittest.TestCase):
+
+    def test_export_atlas(self):
+        with tempfile.TemporaryDirectory() as directory:
+            image_path = os.path.join(directory, "sheet.png")
+            index = export.export_atlas(0x20, 0x7e, sample_font(), image_path, size=16, columns=10, workers=2)
+            self.assertEqual(len(index["glyphs"]), 0x7e - 0x20 + 1, "Missing glyphs in index")
+            cell = index["cell"][0]
+            self.assertEqual(index["glyphs"]["002a"], [0, cell, cell, cell], "Incorrect cell rectangle")
+            with open(os.path.join(directory, "sheet.json")) as file:
+                self.assertEqual(json.load(file), index, "Index not written")
+            with glyphs.Image.open(image_path) as atlas:
+                self.assertEqual(atlas.size, (10 * cell, 10 * cell), "Incorrect atlas size")
+                self.assertIsNotNone(atlas.crop((cell, cell, 2 * cell, 2 * cell)).getbbox(), "Glyph not drawn")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+import threading
+import shelve
+import os
+from favourites import FavouritesStore, migrate_shelve, load_favourites
+import favourites
+
+
+class FavouritesStoreTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "favourites.db")
+        self.store = FavouritesStore(self.path)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.dir.cleanup()
+
+    def test_add_remove(self):
+        self.store.add(45000, "Arial")
+        self.store.add(45000, "Arial")
+        self.store.add(5000, "Courier")
+        self.assertIn((45000, "Arial"), self.store)
+        self.assertEqual(len(self.store), 2, "Duplicate favourite stored")
+        self.store.remove(45000, "Arial")
+        self.assertNotIn((45000, "Arial"), self.store)
+        self.assertEqual(self.store.as_list(), [(5000, "Courier")])
+
+    def test_toggle(self):
+        self.assertTrue(self.store.toggle(45000, "Arial"), "Toggle failed to add")
+        self.assertFalse(self.store.toggle(45000, "Arial"), "Toggle failed to remove")
+        self.assertEqual(len(self.store), 0)
+
+    def test_order_and_persistence(self):
+        favourites = [(45000, "Arial"), (5000, "Courier"), (4000, "Arial")]
+        self.store.replace(favourites)
+        self.store.close()
+        self.store = FavouritesStore(self.path)
+        self.assertEqual(self.store.as_list(), favourites, "Favourites not persisted in order")
+        self.store.clear()
+        self.assertEqual(self.store.as_list(), [])
+
+    def test_write_behind(self):
+        self.store.add(45000, "Arial")
+        self.store.flush()
+        other = FavouritesStore(self.path)
+        self.assertIn((45000, "Arial"), other, "Change not written to database")
+        other.close()
+
+    def test_load_favourites(self):
+        self.store.replace([(45000, "Arial"), (5000, "Courier")])
+        self.store.flush()
+        self.assertEqual(load_favourites(self.path), [(45000, "Arial"), (5000, "Courier")])
+        missing = os.path.join(self.dir.name, "missing.db")
+        self.assertEqual(load_favourites(missing), [])
+        self.assertFalse(os.path.exists(missing), "Database created while reading")
+
+    def test_shared_store(self):
+        self.assertIs(favourites.get_store(), favourites.get_store(), "Store not shared")
+
+    def test_concurrent_access(self):
+        def add(offset):
+            for code_point in range(offset, offset + 50):
+                self.store.add(code_point, "Arial")
+        threads = [threading.Thread(target=add, args=(i * 50,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.store), 200, "Concurrent insertions lost")
+
+    def test_shelve_migration(self):
+        legacy = os.path.join(self.dir.name, "data")
+        with shelve.open(legacy) as data:
+            data["favourites"] = [(45000, "Arial")]
+        migrate_shelve(self.store, legacy)
+        self.assertEqual(self.store.as_list(), [(45000, "Arial")], "Legacy favourites not migrated")
+        migrate_shelve(self.store, os.path.join(self.dir.name, "missing"))
+        self.assertEqual(len(self.store), 1)
+
+    def test_shelve_migrated_once(self):
+        legacy = os.path.join(self.dir.name, "data")
+        with shelve.open(legacy) as data:
+            data["favourites"] = [(45000, "Arial")]
+        migrate_shelve(self.store, legacy)
+        self.store.clear()
+        self.store.close()
+        # Restart with the legacy file still present
+        self.store = FavouritesStore(self.path)
+        migrate_shelve(self.store, legacy)
+        self.assertEqual(self.store.as_list(), [], "Cleared favourites imported again")
+
+
+if __name__ == '__main__':
+    unittest.main()
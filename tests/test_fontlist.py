@@ -0,0 +1,36 @@
+import unittest
+import tempfile
+import json
+import os
+import fontlist
+
+
+class FontListTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "families.json")
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_filtering(self):
+        self.assertEqual(fontlist.filter_families(["Courier", "@Arial", "Arial"]), ["Arial", "Courier"])
+
+    def test_round_trip(self):
+        self.assertIsNone(fontlist.load_families(self.path), "Missing cache treated as valid")
+        fontlist.store_families(["Arial", "Courier"], self.path)
+        self.assertEqual(fontlist.load_families(self.path), ["Arial", "Courier"], "Could not load cached families")
+
+    def test_invalidation(self):
+        fontlist.store_families(["Arial"], self.path)
+        with open(self.path) as file:
+            cached = json.load(file)
+        cached["signature"].append(["/some/new/font/directory", 0])
+        with open(self.path, "w") as file:
+            json.dump(cached, file)
+        self.assertIsNone(fontlist.load_families(self.path), "Stale cache not invalidated")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+from tests.support import MockApp
+from coverage import font_directories
+import glyphs
+
+
+def sample_font():
+    for directory in font_directories():
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                if file.lower().endswith(".ttf"):
+                    return os.path.join(root, file)
+    return None
+
+
+@unittest.skipIf(glyphs.Image is None or sample_font() is None, "Pillow or fonts not available")
+class RasterizeTestCase(unittest.TestCase):
+
+    def test_rasterize(self):
+        image = glyphs.rasterize(0x41, sample_font(), 60)
+        self.assertEqual(image.mode, "RGBA")
+        self.assertIsNotNone(image.getbbox(), "Glyph not drawn")
+        padded = glyphs.rasterize(0x41, sample_font(), 60, padding=5)
+        self.assertEqual(padded.size, (image.width + 10, image.height + 10), "Padding not applied")
+
+    def test_render_glyph(self):
+        image = glyphs.render_glyph(0x41, sample_font(), 60, dpi=96)
+        high_res = glyphs.render_glyph(0x41, sample_font(), 60, dpi=192)
+        self.assertEqual(high_res.info["dpi"], (192, 192), "Resolution not recorded")
+        self.assertAlmostEqual(high_res.height / image.height, 2, delta=0.1, msg="Resolution not applied")
+        self.assertEqual(image.getpixel((0, 0)), (0xf7, 0xf7, 0xf7, 255), "Background not filled")
+
+
+@unittest.skipIf(glyphs.Image is None or sample_font() is None, "Pillow or fonts not available")
+class GlyphCacheTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.app = MockApp()
+        self.cache = glyphs.GlyphCache(self.app, lambda family: sample_font() if family == "Sample" else None)
+
+    def tearDown(self) -> None:
+        self.app.destroy()
+
+    def test_hits_and_misses(self):
+        image = self.cache.get(0x41, "Sample", 40)
+        self.assertIsNotNone(image, "Glyph not rasterized")
+        self.assertIs(self.cache.get(0x41, "Sample", 40), image, "Cached glyph not reused")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertIsNone(self.cache.get(0x41, "Unknown", 40), "Unknown font rasterized")
+
+    def test_eviction(self):
+        first = self.cache.get(0x41, "Sample", 40)
+        cost = self.cache.bytes
+        self.cache.budget = cost * 3
+        for code_point in range(0x42, 0x48):
+            self.cache.get(code_point, "Sample", 40)
+        self.assertLessEqual(self.cache.bytes, self.cache.budget, "Budget exceeded")
+        self.assertGreater(self.cache.evictions, 0, "Nothing evicted")
+        self.assertIsNot(self.cache.get(0x41, "Sample", 40), first, "Least recently used glyph not evicted")
+        self.cache.budget = 0
+        self.assertEqual(len(self.cache), 0, "Shrinking the budget did not evict")
+
+
+if __name__ == '__main__':
+    unittest.main()
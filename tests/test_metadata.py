@@ -0,0 +1,103 @@
+import unittest
+import unicodedata
+import tempfile
+import warnings
+import os
+import metadata
+
+
+class UnicodeIndexTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.index = metadata.get_index()
+
+    def test_blocks_sorted(self):
+        blocks = list(self.index.blocks())
+        self.assertTrue(len(blocks) > 300, "Blocks table not loaded")
+        for (_, end, _), (start, _, name) in zip(blocks, blocks[1:]):
+            with self.subTest(block=name):
+                self.assertGreater(start, end, "Overlapping blocks")
+
+    def test_block(self):
+        self.assertEqual(self.index.block(0x41), "Basic Latin")
+        self.assertEqual(self.index.block(0xafc8), "Hangul Syllables")
+        self.assertEqual(self.index.block(0x1f600), "Emoticons")
+        self.assertEqual(self.index.block(0x50000), "No Block")
+
+    def test_version(self):
+        self.assertEqual(self.index.version, "14.0.0", "Block table version not read")
+        self.assertIn("blocks-14.0.0", metadata.database_path(), "Block table version not in the cache key")
+
+    def test_outdated_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "Blocks.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("# Blocks-1.1.0.txt\n0000..007F; Basic Latin\n")
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                index = metadata.UnicodeIndex(path)
+        self.assertEqual(index.version, "1.1.0")
+        self.assertTrue(any(unicodedata.unidata_version in str(warning.message) for warning in caught),
+                        "Outdated block table not reported")
+
+    def test_block_range(self):
+        self.assertEqual(self.index.block_range("latin extended a"), (0x100, 0x17f))
+        self.assertIsNone(self.index.block_range("klingon"))
+
+    def test_lookup(self):
+        info = metadata.lookup(0x1f600)
+        self.assertEqual(info.name, "GRINNING FACE")
+        self.assertEqual(info.plane, "Supplementary Multilingual")
+        self.assertEqual(info.category, "Other Symbol")
+        self.assertEqual(info.surrogate_pair, (0xd83d, 0xde00))
+        info = metadata.lookup(0)
+        self.assertIsNone(info.name, "Control characters have no name")
+        self.assertEqual(info.category, "Control")
+        self.assertIsNone(info.surrogate_pair)
+
+
+class MetadataDatabaseTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "metadata.bin")
+        metadata.build_database(cls.path)
+        cls.database = metadata.MetadataDatabase(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.database.close()
+        cls.directory.cleanup()
+
+    def test_matches_index(self):
+        index = metadata.get_index()
+        for code_point in (0, 0x41, 0x3b1, 0xd800, 0xe000, 0xafc8, 0x1f600, 0x20000, 0x50000, 0xe0001, 0x10ffff):
+            with self.subTest(code_point=hex(code_point)):
+                self.assertEqual(self.database.lookup(code_point), index.lookup(code_point))
+
+    def test_names(self):
+        names = dict(self.database.names())
+        self.assertEqual(names[0x1f600], "GRINNING FACE")
+        self.assertNotIn(0, names, "Unnamed code point listed")
+        self.assertEqual(self.database.name(0x41), "LATIN CAPITAL LETTER A")
+        self.assertIsNone(self.database.name(0x50000))
+
+    def test_invalid_database(self):
+        path = os.path.join(self.directory.name, "invalid.bin")
+        with open(path, "wb") as file:
+            file.write(b"garbage")
+        with self.assertRaises(ValueError):
+            metadata.MetadataDatabase(path)
+
+    def test_open_rebuilds(self):
+        path = os.path.join(self.directory.name, "rebuilt.bin")
+        with open(path, "wb") as file:
+            file.write(b"garbage")
+        database = metadata.open_database(path)
+        self.assertEqual(database.name(0x41), "LATIN CAPITAL LETTER A")
+        database.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
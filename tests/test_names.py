@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import unicodedata
+import os
+import names
+
+
+class NameIndexTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = names.NameIndex.build()
+
+    def search(self, query):
+        return list(self.index.search(query))
+
+    def test_tokenize(self):
+        self.assertEqual(names.tokenize("greek  small-letter"), ["GREEK", "SMALL", "LETTER"])
+
+    def test_word(self):
+        results = self.search("grinning face")
+        self.assertIn(0x1f600, results)
+        for code_point in results:
+            name = unicodedata.name(chr(code_point))
+            self.assertTrue("GRINNING" in name and "FACE" in name, name)
+
+    def test_prefix(self):
+        self.assertIn(0x3b1, self.search("greek sma alp"))
+
+    def test_substring(self):
+        self.assertIn(0x1f600, self.search("rinning"))
+        self.assertNotIn(0x1f600, self.search("ri"), "Short words must only match prefixes")
+
+    def test_sorted(self):
+        results = self.search("arrow")
+        self.assertEqual(results, sorted(set(results)))
+        self.assertIn(0x2190, results)
+
+    def test_no_results(self):
+        self.assertEqual(self.search("zzqqxx"), [])
+        self.assertEqual(self.search(""), [])
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "names.bin")
+            with open(path, "wb") as file:
+                file.write(self.index.dumps())
+            loaded = names.NameIndex.load(path)
+        self.assertEqual(loaded.tokens, self.index.tokens)
+        self.assertEqual(list(loaded.search("greek small")), self.search("greek small"))
+
+    def test_invalid_file_rebuilt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "names.bin")
+            with open(path, "wb") as file:
+                file.write(b"garbage")
+            self.assertEqual(len(names.NameIndex.load(path)), len(self.index))
+
+
+class SearchCursorTestCase(unittest.TestCase):
+
+    def test_lazy_slices(self):
+        consumed = []
+
+        def results():
+            for value in range(100):
+                consumed.append(value)
+                yield value
+
+        cursor = names.SearchCursor(results())
+        self.assertEqual(cursor.slice(0, 10), list(range(10)))
+        self.assertEqual(len(consumed), 10, "Results computed ahead of time")
+        self.assertEqual(cursor.slice(95, 10), list(range(95, 100)))
+        self.assertTrue(cursor.exhausted)
+        self.assertEqual(cursor.slice(0, 3), [0, 1, 2])
+
+    def test_cancel(self):
+        cursor = names.SearchCursor(iter(range(100)))
+        cursor.slice(0, 5)
+        cursor.cancel()
+        self.assertEqual(cursor.slice(5, 5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import tempfile
+import json
+import os
+from tracing import Tracer
+
+
+class TracerTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tracer = Tracer(window=100)
+
+    def test_disabled(self):
+        with self.tracer.span("render"):
+            pass
+        self.assertEqual(len(self.tracer.events), 0, "Span recorded while disabled")
+        self.assertIs(self.tracer.span("render"), self.tracer.span("other"), "Disabled spans not shared")
+
+    def test_span(self):
+        self.tracer.enable()
+        with self.tracer.span("render"):
+            pass
+        event, = self.tracer.events
+        self.assertEqual(event["name"], "render")
+        self.assertEqual(event["ph"], "X")
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_span_records_on_error(self):
+        self.tracer.enable()
+        with self.assertRaises(ValueError):
+            with self.tracer.span("render"):
+                raise ValueError
+        self.assertEqual(len(self.tracer.events), 1, "Failed span not recorded")
+
+    def test_percentiles(self):
+        self.assertIsNone(self.tracer.percentile("render", 0.5))
+        for milliseconds in range(1, 101):
+            self.tracer.record("render", 0, milliseconds / 1000)
+        self.assertAlmostEqual(self.tracer.percentile("render", 0.5), 51)
+        self.assertAlmostEqual(self.tracer.percentile("render", 0.99), 100)
+        # Only the most recent durations are considered
+        for _ in range(100):
+            self.tracer.record("render", 0, 0.001)
+        self.assertAlmostEqual(self.tracer.percentile("render", 0.99), 1)
+
+    def test_export(self):
+        self.tracer.enable()
+        with self.tracer.span("render"):
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            self.tracer.export(path)
+            with open(path, encoding="utf-8") as file:
+                trace = json.load(file)
+        self.assertEqual([event["name"] for event in trace["traceEvents"]], ["render"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -47,6 +47,13 @@ class GridTestCase(unittest.TestCase):
                 self.grid['font'] = test_font[0]
                 self.assertEqual(self.grid.font, test_font[1])
 
+    def test_shared_font(self):
+        self.assertEqual(self.grid.font, self.app.grid_font.cget("family"), "Shared font not used")
+        self.app.grid_font.configure(family="Courier")
+        for grid in self.app.flattened_grids:
+            with self.subTest(grid=self.app.flattened_grids.index(grid)):
+                self.assertEqual(grid.font, "Courier", "Shared font change not propagated")
+
     def test_copy_mechanism(self):
         self.grid.set(45000)
         self.grid.copy(0)
@@ -64,6 +71,18 @@ class GridTestCase(unittest.TestCase):
         self.assertEqual(self.grid.text, "", "Text unset incorrectly")
         self.assertEqual(self.grid['text'], "", "Text unset incorrectly")
 
+    def test_code_point_views(self):
+        self.grid.set(0x1f600)
+        self.assertEqual(self.grid.code_point, 0x1f600)
+        self.assertEqual(self.grid.hexadecimal, "1f600")
+        self.assertEqual(self.grid.character, chr(0x1f600))
+        self.assertIs(self.grid.text, self.grid.text, "Formatted view not cached")
+        self.grid.set(0x41)
+        self.assertEqual(self.grid.text, "0x41", "Cached view not invalidated")
+        self.grid.set(None)
+        self.assertIsNone(self.grid.code_point)
+        self.assertEqual(self.grid.hexadecimal, "")
+
     def test_menu_request(self):
         self.grid.request_menu(MockEvent())
         self.assertTrue(self.grid.is_locked, "Lock not set on menu request")
@@ -79,6 +98,14 @@ class GridTestCase(unittest.TestCase):
         self.assertEqual(data["Font family"], "Arial Black", "Incorrect font returned")
         self.assertEqual(data["Code point"], "45000", "Incorrect code point returned")
         self.assertEqual(data["Hexadecimal scalar"], "afc8", "Incorrect hex scalar returned")
+        self.assertEqual(data["Plane"], "Basic Multilingual", "Incorrect plane returned")
+        self.assertEqual(data["Block"], "Hangul Syllables", "Incorrect block returned")
+        self.assertEqual(data["Surrogate pair"], "None", "Illegal surrogate pair returned")
+        self.grid.set(0x1f600)
+        data = self.grid.data
+        self.assertEqual(data["Plane"], "Supplementary Multilingual", "Incorrect plane returned")
+        self.assertEqual(data["Surrogate pair"], "d83d de00", "Incorrect surrogate pair returned")
+        self.assertEqual(data["Name"], "GRINNING FACE", "Incorrect name returned")
 
 
 class HexadecimalIntegerTestCase(unittest.TestCase):
@@ -99,14 +126,18 @@ class HexadecimalIntegerTestCase(unittest.TestCase):
         self.assertEqual(self.widget.get(), 45000, 'Incorrect value set')
         self.widget.set('xyz')
         self.assertEqual(self.widget.get(), 45000, 'Illegal value set')
-        self.widget.set('450000')
+        self.widget.set('4500000')
         self.assertEqual(self.widget.get(), 45000, 'Incorrect get value')
+        self.widget.set('10ffff')
+        self.assertEqual(self.widget.get(), 0x10ffff, 'Incorrect get value')
 
     def test_validator(self):
         self.assertTrue(self.widget.validator('45000'), 'Validator failed')
         self.assertTrue(self.widget.validator('ffff'), 'Validator failed')
-        self.assertFalse(self.widget.validator('450000'), 'Validator failed')
-        self.assertFalse(self.widget.validator('fffff'), 'Validator failed')
+        self.assertTrue(self.widget.validator('450000'), 'Validator failed')
+        self.assertTrue(self.widget.validator('10ffff'), 'Validator failed')
+        self.assertFalse(self.widget.validator('1114112'), 'Validator failed')
+        self.assertFalse(self.widget.validator('11ffff'), 'Validator failed')
 
 
 class KeyValueLabelTestCase(unittest.TestCase):
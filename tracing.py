@@ -0,0 +1,92 @@
+"""
+Named timing spans around the hot paths of the viewer. Tracing is off by default in which case a
+span is a shared no-op context manager. When on, spans are kept as Chrome trace events, which can be
+loaded in chrome://tracing or Perfetto, and recent durations per name are kept for percentiles.
+"""
+from collections import deque
+from contextlib import contextmanager
+import threading
+import json
+import time
+import os
+
+MAX_EVENTS = 100000
+WINDOW = 200
+
+
+class _NullSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+
+    def __init__(self, max_events: int = MAX_EVENTS, window: int = WINDOW):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.window = window
+        self.durations = {}
+        self._origin = time.perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.events.clear()
+        self.durations.clear()
+
+    def span(self, name: str):
+        """
+        Time the body of a with statement under name
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """
+        :param start: time.perf_counter() at the start of the span
+        :param end: time.perf_counter() at the end of the span
+        """
+        self.events.append({
+            "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+            "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6
+        })
+        if name not in self.durations:
+            self.durations[name] = deque(maxlen=self.window)
+        self.durations[name].append((end - start) * 1000)
+
+    def percentile(self, name: str, fraction: float):
+        """
+        Duration in milliseconds under which fraction of the recent spans of name fall or None without spans
+        """
+        durations = sorted(self.durations.get(name, ()))
+        if not durations:
+            return None
+        return durations[min(int(fraction * len(durations)), len(durations) - 1)]
+
+    def export(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, file)
+
+
+tracer = Tracer()
+span = tracer.span
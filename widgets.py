@@ -1,7 +1,28 @@
 from tkinter import Label, Entry, StringVar, Frame, Canvas, ttk, Menu
+from tkinter.font import Font
+from codespace import MAX_CODE_POINT
+import metadata
 import re
 
-UNICODE_HEXADECIMAL = re.compile(r'[0-9a-f]{1,4}$')
+UNICODE_HEXADECIMAL = re.compile(r'[0-9a-f]{1,6}$')
+
+
+class NamedFont(Font):
+    """
+    Named font that remembers its configured family so reading it does not go through Tk
+    """
+
+    def __init__(self, root=None, font=None, name=None, exists=False, **options):
+        super().__init__(root, font, name, exists, **options)
+        self.family = super().cget("family")
+
+    def configure(self, **options):
+        result = super().configure(**options)
+        if "family" in options:
+            self.family = options["family"]
+        return result
+
+    config = configure
 
 
 class NavControl(Label):
@@ -50,10 +71,10 @@ class HexadecimalIntegerControl(Entry):
         if value == "":
             return True
         if value.isdigit():
-            if int(value) <= 0xffff:
+            if int(value) <= MAX_CODE_POINT:
                 return True
         if re.match(UNICODE_HEXADECIMAL, value):
-            return True
+            return int(value, 16) <= MAX_CODE_POINT
         return False
 
 
@@ -64,7 +85,7 @@ def text_required(func):
     :return:
     """
     def wrap(self, *args):
-        if not self.text:
+        if self.value is None:
             pass
         else:
             return func(self, *args)
@@ -74,62 +95,136 @@ def text_required(func):
     return wrap
 
 
-class Grid(Label):
+class RepaintStats:
+    """
+    Counts Tk configure round-trips issued by grids against the ones that were skipped
+    because the cell already displayed the requested options.
+    """
 
-    def __init__(self, app, **cnf):
-        super().__init__(app.body, **cnf)
+    def __init__(self):
+        self.issued = 0
+        self.skipped = 0
+
+    def reset(self):
+        self.issued = self.skipped = 0
+
+    def __repr__(self):
+        return "RepaintStats(issued={}, skipped={})".format(self.issued, self.skipped)
+
+
+class GridCell:
+    """
+    Behaviour shared by every kind of grid. Subclasses only decide how painted options reach Tk
+    and must set up the attributes initialised by init_cell.
+    """
+    # Shared by all grids so benchmarks can inspect the cost of a full page flip
+    stats = RepaintStats()
+
+    def init_cell(self, app, named_font, default_fg):
         self.app = app
-        self.config(bg="#f7f7f7")
-        self.bind('<Enter>', lambda ev: self.hover(True))
-        self.bind('<Leave>', lambda ev: self.hover(False))
-        self.bind('<Button-1>', lambda ev: self.lock())
-        self.bind('<Button-3>', lambda ev: self.request_menu(ev))
-        self.text = ""
+        # Grids sharing a named font change family with a single font reconfiguration
+        self.named_font = named_font
+        self.default_fg = default_fg
+        # Last options pushed to Tk, used to skip redundant configure calls
+        self._painted = {"text": "", "bg": "#f7f7f7", "fg": default_fg}
+        # Code point displayed or None, the formatted views of it are derived on first use
+        self.value = None
+        self._views = {}
         self.is_locked = False
 
+    def _apply(self, options: dict):
+        raise NotImplementedError
+
     @property
     def font(self):
+        # Fonts pushed through repaint are known without asking Tk
+        font = self._painted.get("font")
+        if font is None:
+            font = self['font']
+            # The family of a shared named font is kept by the font itself
+            if self.named_font is not None and str(font) == str(self.named_font):
+                return self.named_font.family
+        if isinstance(font, (tuple, list)):
+            return font[0]
         regex = re.compile(r'{(.+)}')
-        if re.match(regex, self['font']):
-            return re.search(regex, self['font']).group(1)
+        if re.match(regex, font):
+            return re.search(regex, font).group(1)
         else:
-            return self['font'].split()[0]
+            return font.split()[0]
+
+    def _view(self, name: str, format_):
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = format_(self.value) if self.value is not None else ""
+        return view
 
     @property
     def code_point(self):
-        return ord(self['text'])
+        return self.value
+
+    @property
+    def text(self) -> str:
+        # Code point as a python hexadecimal literal such as 0x1f600
+        return self._view("text", hex)
+
+    @property
+    def hexadecimal(self) -> str:
+        # Hexadecimal scalar without prefix such as 1f600
+        return self._view("hexadecimal", "{:x}".format)
+
+    @property
+    def character(self) -> str:
+        return self._view("character", chr)
 
+    @text_required
     def copy(self, flag: int):
         self.clipboard_clear()
         if flag == 0:
             # Copy unicode
-            self.clipboard_append(self["text"])
+            self.clipboard_append(self.character)
         elif flag == 1:
             # Copy hexadecimal scalar
-            self.clipboard_append(self.text.replace("0x", ""))
+            self.clipboard_append(self.hexadecimal)
         elif flag == 2:
             # Copy code point
-            self.clipboard_append(str(int(self.text, 16)))
-
-    def set(self, value: int):
+            self.clipboard_append(str(self.value))
+
+    def repaint(self, **options):
+        """
+        Push only the options that differ from what the grid last displayed.
+        :param options: Tk label options such as text, bg and font
+        :return:
+        """
+        changed = {key: value for key, value in options.items() if self._painted.get(key) != value}
+        if not changed:
+            GridCell.stats.skipped += 1
+            return
+        self._painted.update(changed)
+        self._apply(changed)
+        GridCell.stats.issued += 1
+
+    def set(self, value: int, supported: bool = True):
+        if value != self.value:
+            self.value = value
+            self._views = {}
         if value is None:
-            self["text"] = self.text = ""
+            self.repaint(text="")
             return
-        self["text"] = chr(value)
-        self.text = str(hex(value))
+        # Characters the current font has no glyph for are dimmed
+        self.repaint(text=self.character, fg=self.default_fg if supported else "#d0d0d0")
 
     @text_required
     def hover(self, flag=True):
         if flag:
-            self["bg"] = "#bbb"
+            self.repaint(bg="#bbb")
             self.app.activate_grid(self)
         elif not self.is_locked:
-            self["bg"] = "#f7f7f7"
+            self.repaint(bg="#f7f7f7")
 
     def unlock(self):
         self.is_locked = False
         self.app.active_grid = None
-        self['bg'] = "#f7f7f7"
+        self.repaint(bg="#f7f7f7")
 
     @text_required
     def request_menu(self, event=None):
@@ -142,18 +237,113 @@ class Grid(Label):
             self.app.active_grid.unlock()
         self.is_locked = True
         self.app.active_grid = self
-        self["bg"] = "#bbb"
+        self.repaint(bg="#bbb")
 
     @property
     def data(self):
-        return {
-            "Font family": self.font,
-            "Code point": str(int(self.text, 16)),
-            "Hexadecimal scalar": self.text.replace("0x", ""),
-            "Surrogate pair": "None",
-            "Plane": "Basic Multilingual",
-            "Block": "Unknown"
-        }
+        return metadata.describe(self.value, self.font)
+
+
+class Grid(GridCell, Label):
+
+    def __init__(self, app, **cnf):
+        super().__init__(app.body, **cnf)
+        self.config(bg="#f7f7f7")
+        self.init_cell(app, cnf.get("font") if isinstance(cnf.get("font"), Font) else None, self["fg"])
+        self.bind('<Enter>', lambda ev: self.hover(True))
+        self.bind('<Leave>', lambda ev: self.hover(False))
+        self.bind('<Button-1>', lambda ev: self.lock())
+        self.bind('<Button-3>', lambda ev: self.request_menu(ev))
+
+    def _apply(self, options: dict):
+        self.config(**options)
+
+
+class CanvasGrid(GridCell):
+    """
+    Lightweight grid drawn as a rectangle and a text item on a GridCanvas. Tk methods such as
+    clipboard handling are delegated to the canvas so it can stand in for a label grid.
+    """
+
+    def __init__(self, canvas, app, column: int, row: int):
+        self.canvas = canvas
+        self.column, self.row = column, row
+        self.rect = canvas.create_rectangle(0, 0, 0, 0, fill="#f7f7f7", width=0)
+        self.label = canvas.create_text(0, 0, text="", font=canvas.font, fill="black")
+        self.init_cell(app, canvas.font, "black")
+
+    def __getattr__(self, item):
+        return getattr(self.canvas, item)
+
+    def __getitem__(self, key):
+        if key == "font":
+            return str(self.named_font)
+        return self._painted.get(key, "")
+
+    def _apply(self, options: dict):
+        text_options = {}
+        if "text" in options:
+            text_options["text"] = options["text"]
+        if "fg" in options:
+            text_options["fill"] = options["fg"]
+        if "font" in options:
+            text_options["font"] = options["font"]
+        if text_options:
+            self.canvas.itemconfigure(self.label, **text_options)
+        if "bg" in options:
+            self.canvas.itemconfigure(self.rect, fill=options["bg"])
+
+    def place_cell(self, x: float, y: float, width: float, height: float):
+        self.canvas.coords(self.rect, x, y, x + width, y + height)
+        self.canvas.coords(self.label, x + width / 2, y + height / 2)
+
+
+class GridCanvas(Canvas):
+    """
+    Draws a whole page of grids on a single canvas. Pointer events are mapped to grids
+    arithmetically so the number of grids only costs canvas items, not widgets and bindings.
+    """
+
+    def __init__(self, app, columns: int, rows: int, font, **cnf):
+        super().__init__(app.body, highlightthickness=0, bd=0, bg="#f7f7f7", **cnf)
+        self.app = app
+        self.columns, self.rows = columns, rows
+        self.font = font
+        self.cells = [[CanvasGrid(self, app, i, j) for j in range(rows)] for i in range(columns)]
+        self.hovered = None
+        self._width = self._height = 0
+        self.bind('<Configure>', lambda ev: self.layout(ev.width, ev.height))
+        self.bind('<Motion>', lambda ev: self.hover_at(ev.x, ev.y))
+        self.bind('<Leave>', lambda ev: self.hover_at(-1, -1))
+        self.bind('<Button-1>', lambda ev: self._dispatch(ev, lambda cell: cell.lock()))
+        self.bind('<Button-3>', lambda ev: self._dispatch(ev, lambda cell: cell.request_menu(ev)))
+
+    def layout(self, width: int, height: int):
+        self._width, self._height = width, height
+        cell_width, cell_height = width / self.columns, height / self.rows
+        for column in self.cells:
+            for cell in column:
+                cell.place_cell(cell.column * cell_width, cell.row * cell_height, cell_width, cell_height)
+
+    def cell_at(self, x: int, y: int):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        return self.cells[int(x * self.columns // self._width)][int(y * self.rows // self._height)]
+
+    def hover_at(self, x: int, y: int):
+        cell = self.cell_at(x, y)
+        if cell is self.hovered:
+            return
+        if self.hovered is not None:
+            self.hovered.hover(False)
+        self.hovered = cell
+        if cell is not None:
+            cell.hover(True)
+
+    def _dispatch(self, event, action):
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None:
+            action(cell)
 
 
 class ContextMenu(Menu):
@@ -191,22 +381,84 @@ class KeyValueLabel(Frame):
         self.clipboard_append(self._val['text'])
 
 
-class ScrolledGridHolder(Frame):
+class VirtualGridHolder(Frame):
+    """
+    Horizontally scrolled column-major grid of items. Only the cells visible in the viewport exist
+    as widgets and they are recycled to display other items when scrolling, so the number of
+    widgets does not depend on the number of items.
+    """
 
-    def __init__(self, master, **cnf):
+    def __init__(self, master, create_cell, bind_cell, rows=6, cell_size=40, width=400, **cnf):
         super().__init__(master, **cnf)
-        self.canvas = Canvas(self, highlightthickness=0, **cnf)
-        self.canvas.pack(side="top", fill="both", expand=True)
-        self.scroll = ttk.Scrollbar(self, orient='horizontal', command=self.canvas.xview)
+        self.rows = rows
+        self.cell_size = cell_size
+        self.columns = width // cell_size
+        self.create_cell = create_cell
+        self.bind_cell = bind_cell
+        self.body = Frame(self, bg=self['bg'], width=width, height=rows * cell_size)
+        self.body.pack(side="top")
+        self.scroll = ttk.Scrollbar(self, orient='horizontal', command=self.xview)
         self.scroll.pack(side='top', fill='x', expand=True)
-        self.canvas['xscrollcommand'] = self.scroll.set
-        self.body = Frame(self, bg=self['bg'])
-        self.window = self.canvas.create_window(0, 0, anchor='nw', window=self.body)
-        self.tk = self.body.tk
-        self.bind('<Configure>', self.on_configure)
-        self.event_generate('<Configure>')
-
-    def on_configure(self, _):
-        self.canvas.update_idletasks()
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
-        self.canvas.update_idletasks()
+        self.bind_scrolling(self.body)
+        self.items = []
+        self.cells = []
+        self.first_column = 0
+
+    def bind_scrolling(self, widget):
+        # Cells cover the body so they need the bindings too. The holder only scrolls horizontally
+        # so the wheel scrolls it with or without shift
+        for sequence in ('<MouseWheel>', '<Shift-MouseWheel>'):
+            widget.bind(sequence, lambda ev: self.xview("scroll", -1 if ev.delta > 0 else 1, "units"))
+        # X11 reports the mouse wheel as buttons 4 and 5, these also fire with shift held
+        widget.bind('<Button-4>', lambda ev: self.xview("scroll", -1, "units"))
+        widget.bind('<Button-5>', lambda ev: self.xview("scroll", 1, "units"))
+
+    @property
+    def total_columns(self) -> int:
+        return -(-len(self.items) // self.rows)
+
+    @property
+    def visible_cells(self) -> list:
+        # Cells currently displaying an item
+        return self.cells[:max(0, min(len(self.cells), len(self.items) - self.first_column * self.rows))]
+
+    def load(self, items: list):
+        self.items = items
+        self.first_column = 0
+        self.refresh()
+
+    def xview(self, *args):
+        if args[0] == "moveto":
+            column = round(float(args[1]) * self.total_columns)
+        else:
+            step = int(args[1]) * (self.columns if args[2] == "pages" else 1)
+            column = self.first_column + step
+        column = max(0, min(column, self.total_columns - self.columns))
+        if column != self.first_column:
+            self.first_column = column
+            self.refresh()
+
+    def refresh(self):
+        # Rebind the visible window of items to the recycled cells
+        offset = self.first_column * self.rows
+        visible = self.items[offset: offset + self.columns * self.rows]
+        for index, item in enumerate(visible):
+            if index == len(self.cells):
+                self.cells.append(self.create_cell())
+                self.bind_scrolling(self.cells[-1])
+            cell = self.cells[index]
+            self.bind_cell(cell, item)
+            column, row = divmod(index, self.rows)
+            cell.place(x=column * self.cell_size, y=row * self.cell_size,
+                       width=self.cell_size, height=self.cell_size)
+        for cell in self.cells[len(visible):]:
+            cell.place_forget()
+        total = max(self.total_columns, 1)
+        self.scroll.set(self.first_column / total, min(1, (self.first_column + self.columns) / total))
+
+    def remove(self, cell):
+        # Drop the item displayed by a visible cell. Only the visible cells are rebound
+        del self.items[self.first_column * self.rows + self.cells.index(cell)]
+        if self.first_column and self.first_column > self.total_columns - self.columns:
+            self.first_column = max(0, self.total_columns - self.columns)
+        self.refresh()